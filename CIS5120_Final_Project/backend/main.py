@@ -1,14 +1,20 @@
 """
 Main module for the RotorBench backend.
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, Response
 from typing import List
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-import json, io, zipfile, hashlib, subprocess
+from functools import lru_cache
+import io, zipfile, hashlib, subprocess
+import os
+import asyncio
+import random
+import string
 import uvicorn
 import pathlib
 import logging
@@ -30,17 +36,22 @@ from utils.component_data import (
     get_all_receivers,
     get_component_by_id,
     get_all_saved_builds,
+    get_saved_build_by_id,
     hydrate_build,
+    hydrate_builds,
     save_build,
-    delete_build
+    delete_build,
+    file_stamp,
+    COMPONENTS_FILE,
+    BUILDS_FILE
 )
 from utils.build_analysis import analyze_build
 from models.user import UserProfile
-from utils.user_data import list_users, get_user, save_user, delete_user
-from utils.builds_data import list_builds, get_build, create_build, update_build, delete_build
+from utils.user_data import list_users, get_user, save_user, delete_user, USERS_FILE
 from utils.model_converter import ModelConverter
 
 from datetime import datetime
+from urllib.parse import quote
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -53,24 +64,64 @@ SUPPORTED  = {".obj",".stl",".ply",".off",".dae",".3mf",".gltf",".glb",".step","
 # Cache TTL in hours (set to 0 to disable TTL, files only expire when source changes)
 CACHE_TTL_HOURS = 24  # Cached models expire after 24 hours
 
+# Expired cached models are swept in the background this often
+CACHE_CLEANUP_INTERVAL_SECONDS = 3600
+
+# When running behind nginx, set this to an internal location aliasing assets-cache/
+# (e.g. "/_cache/") so converted models are sent by nginx via X-Accel-Redirect
+MODEL_ACCEL_REDIRECT_PREFIX = os.environ.get("MODEL_ACCEL_REDIRECT_PREFIX")
+
 # Initialize model converter with TTL
 model_converter = ModelConverter(ASSET_ROOT, CACHE_ROOT, cache_ttl_hours=CACHE_TTL_HOURS)
 
-class Build(BaseModel):
-    id: Optional[str] = None
-    userId: str
-    name: Optional[str] = None
-    note: Optional[str] = None
-    frameId: str
-    motorId: str
-    propellerId: str
-    batteryId: str
-    escId: Optional[str] = None
-    fcId: Optional[str] = None
-    receiverId: Optional[str] = None
-    totalWeight: Optional[float] = None
-    createdAt: Optional[str] = None
-    updatedAt: Optional[str] = None
+@lru_cache(maxsize=None)
+def _adapter(model_type) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+# Serialized JSON payloads keyed by name -> (source file stamps, bytes), least recently
+# used first. Per-build, per-user and per-component-set keys are only refreshed when
+# requested, so the cap keeps entries for deleted or rarely used ids from piling up.
+_STATIC_JSON: OrderedDict = OrderedDict()
+_STATIC_JSON_MAX_ENTRIES = 1024
+
+async def cached_response(
+    key: str,
+    sources,
+    model_type,
+    loader,
+    exclude_none: bool = False
+) -> Response:
+    """
+    Serve a payload that only changes when its backing JSON file(s) do.
+    `sources` is a path or a tuple of paths; the bytes are rebuilt on the first
+    request after any of them changes mtime/size. If `loader` raises, nothing is cached.
+    Rebuilds (file read + dump) run in a worker thread so they don't block the event loop.
+    """
+    if isinstance(sources, pathlib.Path):
+        sources = (sources,)
+    stamp = tuple(file_stamp(path) for path in sources)
+    cached = _STATIC_JSON.get(key)
+    if cached is None or cached[0] != stamp:
+        _STATIC_JSON.pop(key, None)
+        content = await asyncio.to_thread(
+            lambda: _adapter(model_type).dump_json(loader(), by_alias=True, exclude_none=exclude_none)
+        )
+        cached = (stamp, content)
+        _STATIC_JSON[key] = cached
+        if len(_STATIC_JSON) > _STATIC_JSON_MAX_ENTRIES:
+            _STATIC_JSON.popitem(last=False)
+    else:
+        _STATIC_JSON.move_to_end(key)
+    return Response(content=cached[1], media_type="application/json")
+
+async def _periodic_cache_cleanup():
+    """Sweep expired cache files on a worker thread, so no request pays for the directory walk"""
+    while True:
+        await asyncio.sleep(CACHE_CLEANUP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(model_converter.cleanup_expired_cache)
+        except Exception as e:
+            logger.error(f"Background cache cleanup failed: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -93,12 +144,19 @@ async def lifespan(app: FastAPI):
     print(f"Cache: {cache_stats['total_files']} files, {cache_stats['total_size_mb']} MB")
     print("="*60 + "\n")
     
+    cleanup_task = asyncio.create_task(_periodic_cache_cleanup())
+    
     yield
     
     # Shutdown
+    cleanup_task.cancel()
     print("\nRotorBench Backend Server Shutting Down")
 
-app = FastAPI(title="RotorBench API", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="RotorBench API",
+    version="1.0.0",
+    lifespan=lifespan
+)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -123,96 +181,92 @@ async def root():
 
 
 # Component endpoints
-@app.get("/api/components", response_model=ComponentDatabase)
+@app.get("/api/components")
 async def get_components():
     """Get all available drone components"""
-    return get_all_components_db()
-
-
-@app.get("/api/components/motors", response_model=List[Motor])
-async def get_motors():
-    """Get all available motors"""
-    return get_all_motors()
-
-
-@app.get("/api/components/propellers", response_model=List[Propeller])
-async def get_propellers():
-    """Get all available propellers"""
-    return get_all_propellers()
-
-
-@app.get("/api/components/escs", response_model=List[ESC])
-async def get_escs():
-    """Get all available ESCs"""
-    return get_all_escs()
+    return await cached_response("components", COMPONENTS_FILE, ComponentDatabase, get_all_components_db)
 
 
-@app.get("/api/components/flight-controllers", response_model=List[FlightController])
-async def get_flight_controllers():
-    """Get all available flight controllers"""
-    return get_all_flight_controllers()
+# URL segment -> (response type, loader) for the per-type component lists
+COMPONENT_LISTS = {
+    "motors": (List[Motor], get_all_motors),
+    "propellers": (List[Propeller], get_all_propellers),
+    "escs": (List[ESC], get_all_escs),
+    "flight-controllers": (List[FlightController], get_all_flight_controllers),
+    "frames": (List[Frame], get_all_frames),
+    "batteries": (List[Battery], get_all_batteries),
+    "receivers": (List[Receiver], get_all_receivers),
+}
 
 
-@app.get("/api/components/frames", response_model=List[Frame])
-async def get_frames():
-    """Get all available frames"""
-    return get_all_frames()
-
-
-@app.get("/api/components/batteries", response_model=List[Battery])
-async def get_batteries():
-    """Get all available batteries"""
-    return get_all_batteries()
-
-
-@app.get("/api/components/receivers", response_model=List[Receiver])
-async def get_receivers():
-    """Get all available receivers"""
-    return get_all_receivers()
+@app.get("/api/components/{kind}")
+async def get_component_list(kind: str):
+    """Get all available components of one kind (motors, propellers, escs, ...)"""
+    entry = COMPONENT_LISTS.get(kind)
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"Unknown component type: {kind}")
+    model_type, loader = entry
+    return await cached_response(kind, COMPONENTS_FILE, model_type, loader)
 
 
 @app.get("/api/components/{component_type}/{component_id}")
 async def get_component(component_type: str, component_id: str):
     """Get a specific component by type and ID"""
-    component = get_component_by_id(component_type, component_id)
+    component = await asyncio.to_thread(get_component_by_id, component_type, component_id)
     if not component:
         raise HTTPException(status_code=404, detail="Component not found")
     return component
 
 
 # Build endpoints
-@app.get("/api/builds", response_model=List[DroneBuildConfig])
+@app.get("/api/builds")
 async def get_builds():
     """Get all saved build configurations"""
-    return get_all_saved_builds()
+    return await cached_response(
+        "builds", BUILDS_FILE, List[DroneBuildConfig], get_all_saved_builds, exclude_none=True
+    )
 
 
-@app.post("/api/builds", response_model=DroneBuildConfig)
+@app.post("/api/builds", response_model=DroneBuildConfig, response_model_exclude_none=True)
 async def create_build(build_config: DroneBuildConfig):
     """Save a new build configuration"""
-    success = save_build(build_config)
+    success = await asyncio.to_thread(save_build, build_config)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to save build")
     return build_config
 
 
-@app.get("/api/builds/{build_id}", response_model=DroneBuildConfig)
+@app.get("/api/builds/hydrated")
+async def get_hydrated_builds(ids: Optional[str] = Query(None)):
+    """
+    Hydrate several saved builds in one request (?ids=a,b,c).
+    Returns every saved build when ids is omitted; unknown IDs are skipped.
+    """
+    def load_hydrated():
+        build_configs = get_all_saved_builds()
+        if ids:
+            by_id = {build.id: build for build in build_configs}
+            build_configs = [by_id[bid] for bid in ids.split(",") if bid in by_id]
+        return _adapter(List[DroneBuild]).dump_json(hydrate_builds(build_configs), by_alias=True)
+    return Response(content=await asyncio.to_thread(load_hydrated), media_type="application/json")
+
+
+@app.get("/api/builds/{build_id}", response_model=DroneBuildConfig, response_model_exclude_none=True)
 async def get_build(build_id: str):
     """Get a specific build configuration by ID"""
-    builds = get_all_saved_builds()
-    for build in builds:
-        if build.id == build_id:
-            return build
-    raise HTTPException(status_code=404, detail="Build not found")
+    build = await asyncio.to_thread(get_saved_build_by_id, build_id)
+    if not build:
+        raise HTTPException(status_code=404, detail="Build not found")
+    return build
 
 
-@app.put("/api/builds/{build_id}", response_model=DroneBuildConfig)
+@app.put("/api/builds/{build_id}", response_model=DroneBuildConfig, response_model_exclude_none=True)
 async def update_build(build_id: str, build_config: DroneBuildConfig):
     """Update an existing build configuration"""
     if build_id != build_config.id:
         raise HTTPException(status_code=400, detail="Build ID mismatch")
     
-    success = save_build(build_config)
+    success = await asyncio.to_thread(save_build, build_config)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update build")
     return build_config
@@ -221,33 +275,32 @@ async def update_build(build_id: str, build_config: DroneBuildConfig):
 @app.delete("/api/builds/{build_id}")
 async def delete_build_endpoint(build_id: str):
     """Delete a build configuration"""
-    success = delete_build(build_id)
+    success = await asyncio.to_thread(delete_build, build_id)
     if not success:
         raise HTTPException(status_code=404, detail="Build not found")
     return {"message": "Build deleted successfully"}
 
 
-@app.get("/api/builds/{build_id}/hydrated", response_model=DroneBuild)
+@app.get("/api/builds/{build_id}/hydrated")
 async def get_hydrated_build(build_id: str):
     """
     Get a build with all component details (hydrated from IDs)
     Useful for analysis without sending full component objects
     """
-    builds = get_all_saved_builds()
-    build_config = None
-    for build in builds:
-        if build.id == build_id:
-            build_config = build
-            break
-    
-    if not build_config:
-        raise HTTPException(status_code=404, detail="Build not found")
-    
-    hydrated = hydrate_build(build_config)
-    if not hydrated:
-        raise HTTPException(status_code=500, detail="Failed to hydrate build")
-    
-    return hydrated
+    def load_hydrated():
+        build_config = get_saved_build_by_id(build_id)
+        if not build_config:
+            raise HTTPException(status_code=404, detail="Build not found")
+        
+        hydrated = hydrate_build(build_config)
+        if not hydrated:
+            raise HTTPException(status_code=500, detail="Failed to hydrate build")
+        return hydrated
+    
+    # Depends on both the saved build and the catalog it references
+    return await cached_response(
+        f"hydrated:{build_id}", (BUILDS_FILE, COMPONENTS_FILE), DroneBuild, load_hydrated
+    )
 
 
 @app.post("/api/builds/analyze", response_model=BuildAnalysis)
@@ -268,7 +321,8 @@ async def analyze_drone_build(build: DroneBuild):
         print(f"  ESC: {build.components.esc.name if build.components.esc else 'None'}")
         print(f"  FC: {build.components.flight_controller.name if build.components.flight_controller else 'None'}")
     
-    analysis = analyze_build(build)
+    # CPU-bound; keep it off the event loop so other requests on this worker keep flowing
+    analysis = await asyncio.to_thread(analyze_build, build)
     
     print(f"Analysis complete:")
     print(f"  Flight Time: {analysis.flight_simulation.estimated_flight_time} min")
@@ -287,52 +341,57 @@ async def analyze_saved_build(build_id: str):
     Analyze a saved build configuration by ID.
     Hydrates the build from stored component IDs and analyzes it.
     """
-    builds = get_all_saved_builds()
-    build_config = None
-    for build in builds:
-        if build.id == build_id:
-            build_config = build
-            break
-    
+    build_config = await asyncio.to_thread(get_saved_build_by_id, build_id)
     if not build_config:
         raise HTTPException(status_code=404, detail="Build not found")
     
-    hydrated = hydrate_build(build_config)
-    if not hydrated:
-        raise HTTPException(status_code=500, detail="Failed to hydrate build")
-    
-    return analyze_build(hydrated)
-
-@app.get("/api/users", response_model=List[UserProfile])
+    def run_analysis():
+        hydrated = hydrate_build(build_config)
+        if not hydrated:
+            raise HTTPException(status_code=500, detail="Failed to hydrate build")
+        return analyze_build(hydrated)
+    
+    # The analysis depends only on the selected components, so builds sharing
+    # a component set share one cached result until the catalog changes
+    ids = build_config.component_ids
+    key = "analysis:" + "|".join(str(component_id) for component_id in (
+        ids.frame_id, ids.motor_id, ids.propeller_id, ids.esc_id,
+        ids.flight_controller_id, ids.battery_id, ids.receiver_id
+    ))
+    return await cached_response(key, COMPONENTS_FILE, BuildAnalysis, run_analysis)
+
+@app.get("/api/users")
 async def api_list_users():
-    return list_users()
+    return await cached_response("users", USERS_FILE, List[UserProfile], list_users, exclude_none=True)
 
-@app.get("/api/users/{user_id}", response_model=UserProfile)
+@app.get("/api/users/{user_id}")
 async def api_get_user(user_id: str):
-    user = get_user(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    def load_user():
+        user = get_user(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+    return await cached_response(f"user:{user_id}", USERS_FILE, UserProfile, load_user, exclude_none=True)
 
 import uuid
 
 @app.post("/api/users")
-async def api_create_or_login_user(profile: UserProfile):
+async def api_create_or_login_user(profile: UserProfile, background_tasks: BackgroundTasks):
     if not profile.email:
         raise HTTPException(status_code=400, detail="Email is required")
 
-    users = list_users()
+    users = await asyncio.to_thread(list_users)
     now = datetime.utcnow()
 
     existing_user = next((u for u in users if u.email == profile.email), None)
     if existing_user:
         existing_user.updated_at = now
-        save_user(existing_user)
+        # Only bumps the login timestamp, so persist it after responding
+        background_tasks.add_task(save_user, existing_user)
         return {"user": existing_user, "isNew": False}  # Add a badge
 
     # New registration
     if not profile.display_name or profile.display_name.strip() == "":
-        import random, string
         random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
         profile.display_name = f"User_{random_suffix}"
 
@@ -340,64 +399,32 @@ async def api_create_or_login_user(profile: UserProfile):
     profile.created_at = now
     profile.updated_at = now
 
-    if not save_user(profile):
+    if not await asyncio.to_thread(save_user, profile):
         raise HTTPException(status_code=500, detail="Failed to save user")
 
     return {"user": profile, "isNew": True}
 
-@app.put("/api/users/{user_id}", response_model=UserProfile)
+@app.put("/api/users/{user_id}", response_model=UserProfile, response_model_exclude_none=True)
 async def api_update_user(user_id: str, profile: UserProfile):
     if user_id != profile.id:
         raise HTTPException(status_code=400, detail="User ID mismatch")
 
+    now = datetime.utcnow()
     if profile.created_at is None:
-        profile.created_at = datetime.utcnow()
-    profile.updated_at = datetime.utcnow()
+        profile.created_at = now
+    profile.updated_at = now
 
-    if not save_user(profile):
+    if not await asyncio.to_thread(save_user, profile):
         raise HTTPException(status_code=500, detail="Failed to update user")
     return profile
 
 
 @app.delete("/api/users/{user_id}")
 async def api_delete_user(user_id: str):
-    if not delete_user(user_id):
+    if not await asyncio.to_thread(delete_user, user_id):
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
 
-@app.get("/api/builds")
-def api_list_builds(userId: Optional[str] = Query(None)):
-    return list_builds(userId)
-
-@app.get("/api/builds/{bid}")
-def api_get_build(bid: str):
-    b = get_build(bid)
-    if not b:
-        raise HTTPException(status_code=404, detail="Build not found")
-    return b
-
-@app.post("/api/builds", status_code=201)
-def api_create_build(build: Build):
-    if not build.userId:
-        raise HTTPException(status_code=400, detail="userId is required")
-    return create_build(build.model_dump(exclude_none=True))
-
-@app.put("/api/builds/{bid}")
-def api_put_build(bid: str, build: Build):
-    if build.id and build.id != bid:
-        raise HTTPException(status_code=400, detail="ID mismatch")
-    updated = update_build(bid, build.model_dump(exclude_none=True))
-    if not updated:
-        raise HTTPException(status_code=404, detail="Build not found")
-    return updated
-
-@app.delete("/api/builds/{bid}")
-def api_delete_build(bid: str):
-    if not delete_build(bid):
-        raise HTTPException(status_code=404, detail="Build not found")
-    return {"ok": True}
-
-
 # Model conversion and serving endpoints
 @app.get("/api/models/convert/{category}/{filename}")
 @app.head("/api/models/convert/{category}/{filename}")
@@ -420,7 +447,9 @@ async def convert_model(
     """
     logger.info(f"Converting model: {category}/{filename} to {format}")
     
-    converted_path, error = model_converter.convert_component_model(
+    # A cache miss runs a full STEP/STL conversion; keep it off the event loop
+    converted_path, error = await asyncio.to_thread(
+        model_converter.convert_component_model,
         category=category,
         filename=filename,
         output_format=format
@@ -432,11 +461,26 @@ async def convert_model(
     
     # Determine media type
     media_type = "model/gltf-binary" if format == "glb" else "model/gltf+json"
+    download_name = f"{pathlib.Path(filename).stem}.{format}"
+    
+    # Let the proxy stream the file itself, keeping the bytes out of this process
+    if MODEL_ACCEL_REDIRECT_PREFIX:
+        served_path = model_converter.get_served_path(converted_path, MODEL_ACCEL_REDIRECT_PREFIX)
+        if served_path:
+            quoted_name = quote(download_name)
+            disposition = (
+                f'attachment; filename="{download_name}"' if quoted_name == download_name
+                else f"attachment; filename*=utf-8''{quoted_name}"
+            )
+            return Response(
+                media_type=media_type,
+                headers={"X-Accel-Redirect": quote(served_path), "Content-Disposition": disposition}
+            )
     
     return FileResponse(
         path=str(converted_path),
         media_type=media_type,
-        filename=f"{pathlib.Path(filename).stem}.{format}"
+        filename=download_name
     )
 
 
@@ -520,11 +564,19 @@ async def batch_convert_models(
     if not models:
         raise HTTPException(status_code=400, detail="No models specified")
     
+    # Convert every well-formed entry in one parallel batch, off the event loop
+    requested = [
+        (model_info.get("category"), model_info.get("filename"))
+        for model_info in models
+    ]
+    converted = iter(await asyncio.to_thread(
+        model_converter.convert_many,
+        [(category, filename) for category, filename in requested if category and filename],
+        format
+    ))
+    
     results = []
-    for model_info in models:
-        category = model_info.get("category")
-        filename = model_info.get("filename")
-        
+    for category, filename in requested:
         if not category or not filename:
             results.append({
                 "category": category,
@@ -534,11 +586,7 @@ async def batch_convert_models(
             })
             continue
         
-        converted_path, error = model_converter.convert_component_model(
-            category=category,
-            filename=filename,
-            output_format=format
-        )
+        converted_path, error = next(converted)
         
         if error or not converted_path:
             results.append({
@@ -566,7 +614,7 @@ async def get_cache_stats():
     Returns:
         Cache statistics including file count, size, and expired files
     """
-    return model_converter.get_cache_stats()
+    return await asyncio.to_thread(model_converter.get_cache_stats)
 
 
 @app.post("/api/models/cache/cleanup")
@@ -577,7 +625,7 @@ async def cleanup_cache():
     Returns:
         Number of files deleted
     """
-    deleted_count = model_converter.cleanup_expired_cache()
+    deleted_count = await asyncio.to_thread(model_converter.cleanup_expired_cache)
     return {
         "message": f"Cache cleanup completed",
         "deleted_files": deleted_count
@@ -592,7 +640,7 @@ async def clear_cache():
     Returns:
         Number of files deleted
     """
-    deleted_count = model_converter.clear_all_cache()
+    deleted_count = await asyncio.to_thread(model_converter.clear_all_cache)
     return {
         "message": "Cache cleared",
         "deleted_files": deleted_count
@@ -600,5 +648,14 @@ async def clear_cache():
 
 
 if __name__ == "__main__":
-    # boot up api server
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # boot up api server; set WEB_CONCURRENCY for more workers (POSIX only: file
+    # locking is a no-op on Windows). The app must be an import string for workers > 1.
+    # "auto" picks uvloop/httptools when installed and falls back to asyncio/h11.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        loop="auto",
+        http="auto"
+    )
@@ -2,16 +2,32 @@
 Pydantic models for drone components.
 These models provide validation and serialization for the API.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
+import numpy as np
+
+
+class Curve:
+    """
+    Parallel x/y NumPy arrays for np.interp.
+    Compares by identity, so a cached curve in a model's __dict__ doesn't break model equality.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = x
+        self.y = y
 
 
 class VoltageRange(BaseModel):
     min: float = Field(..., description="Minimum voltage")
     max: float = Field(..., description="Maximum voltage")
 
+    model_config = ConfigDict(frozen=True)
+
 
 class Motor(BaseModel):
     id: str
@@ -23,14 +39,15 @@ class Motor(BaseModel):
     size: str = Field(..., description="Motor size (e.g., 2207, 2306)")
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class ThrustDataPoint(BaseModel):
     kv: int = Field(..., description="Motor KV this thrust data applies to")
     thrust: float = Field(..., description="Thrust in grams at full throttle")
 
+    model_config = ConfigDict(frozen=True)
+
 
 class Propeller(BaseModel):
     id: str
@@ -43,8 +60,16 @@ class Propeller(BaseModel):
     price: float
     thrust_data: List[ThrustDataPoint] = Field(..., alias="thrustData", description="Thrust data for different motor KVs")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
+
+    @cached_property
+    def thrust_curve(self) -> Curve:
+        """thrust_data as KV (x) -> thrust (y) arrays sorted by KV"""
+        points = sorted(self.thrust_data, key=lambda point: point.kv)
+        return Curve(
+            np.fromiter((point.kv for point in points), dtype=float, count=len(points)),
+            np.fromiter((point.thrust for point in points), dtype=float, count=len(points))
+        )
 
 
 class ESC(BaseModel):
@@ -58,8 +83,7 @@ class ESC(BaseModel):
     protocol: List[str] = Field(..., description="Supported protocols (e.g., DShot600)")
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class FlightController(BaseModel):
@@ -74,8 +98,7 @@ class FlightController(BaseModel):
     features: List[str] = Field(..., description="Features like OSD, Blackbox, etc.")
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class Frame(BaseModel):
@@ -89,14 +112,15 @@ class Frame(BaseModel):
     stack_height: float = Field(..., alias="stackHeight", description="Stack mounting height in mm")
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class DischargePoint(BaseModel):
     percentage: float = Field(..., ge=0, le=100, description="Battery percentage remaining")
     voltage: float = Field(..., description="Voltage at this percentage")
 
+    model_config = ConfigDict(frozen=True)
+
 
 class Battery(BaseModel):
     id: str
@@ -111,8 +135,16 @@ class Battery(BaseModel):
     )
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
+
+    @cached_property
+    def discharge_curve(self) -> Curve:
+        """discharge_profile as percentage (x) -> voltage (y) arrays in ascending percentage order"""
+        points = sorted(self.discharge_profile, key=lambda point: point.percentage)
+        return Curve(
+            np.fromiter((point.percentage for point in points), dtype=float, count=len(points)),
+            np.fromiter((point.voltage for point in points), dtype=float, count=len(points))
+        )
 
 
 class Receiver(BaseModel):
@@ -124,8 +156,7 @@ class Receiver(BaseModel):
     channels: int
     price: float
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class ComponentDatabase(BaseModel):
@@ -148,8 +179,7 @@ class ComponentIds(BaseModel):
     battery_id: Optional[str] = Field(None, alias="batteryId")
     receiver_id: Optional[str] = Field(None, alias="receiverId")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class DroneBuildConfig(BaseModel):
@@ -161,8 +191,7 @@ class DroneBuildConfig(BaseModel):
     created_at: datetime = Field(..., alias="createdAt")
     updated_at: datetime = Field(..., alias="updatedAt")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class DroneComponents(BaseModel):
@@ -174,8 +203,7 @@ class DroneComponents(BaseModel):
     battery: Optional[Battery] = None
     receiver: Optional[Receiver] = None
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class DroneBuild(BaseModel):
@@ -187,8 +215,7 @@ class DroneBuild(BaseModel):
     created_at: datetime = Field(..., alias="createdAt")
     updated_at: datetime = Field(..., alias="updatedAt")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class WeightRating(str, Enum):
@@ -208,8 +235,7 @@ class PerformanceRating(BaseModel):
     weight: WeightRating
     thrust_to_weight: ThrustRating = Field(..., alias="thrustToWeight")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class PerformanceMetrics(BaseModel):
@@ -219,8 +245,7 @@ class PerformanceMetrics(BaseModel):
     power_draw: float = Field(..., alias="powerDraw", description="Average power draw in watts")
     rating: PerformanceRating
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class DischargeDataPoint(BaseModel):
@@ -229,8 +254,7 @@ class DischargeDataPoint(BaseModel):
     remaining_capacity: float = Field(..., alias="remainingCapacity", description="Remaining capacity in mAh")
     current_draw: float = Field(..., alias="currentDraw", description="Current draw in amps")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ThrottleProfilePoint(BaseModel):
@@ -252,8 +276,7 @@ class FlightSimulation(BaseModel):
     discharge_data: List[DischargeDataPoint] = Field(..., alias="dischargeData")
     throttle_profile: List[ThrottleProfilePoint] = Field(..., alias="throttleProfile")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class BuildAnalysis(BaseModel):
@@ -264,5 +287,4 @@ class BuildAnalysis(BaseModel):
     flight_simulation: FlightSimulation = Field(..., alias="flightSimulation")
     total_cost: float = Field(..., alias="totalCost")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
@@ -1,8 +1,12 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, Dict
 from datetime import datetime
 
 class UserProfile(BaseModel):
+    """
+    EmailStr is only checked on request bodies; rows read back from users.json
+    go through from_trusted and skip validation.
+    """
     id: Optional[str] = None  # Make it optional
     email: EmailStr
     display_name: str = Field(..., alias="displayName")
@@ -12,5 +16,28 @@ class UserProfile(BaseModel):
     created_at: Optional[datetime] = Field(None, alias="createdAt")
     updated_at: Optional[datetime] = Field(None, alias="updatedAt")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+    @classmethod
+    def from_trusted(cls, data: dict) -> "UserProfile":
+        """
+        Build a profile from a users.json row without validation.
+        Accepts field names or aliases; ISO timestamp strings are parsed.
+        """
+        values = {}
+        for name, alias in _FIELD_KEYS:
+            if alias in data:
+                value = data[alias]
+            elif name in data:
+                value = data[name]
+            else:
+                continue
+            if name in _DATETIME_FIELDS and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            values[name] = value
+        return cls.model_construct(**values)
+
+
+# (name, alias) per field, and the fields stored as ISO strings
+_FIELD_KEYS = tuple((name, field.alias or name) for name, field in UserProfile.model_fields.items())
+_DATETIME_FIELDS = frozenset({"created_at", "updated_at"})
@@ -3,22 +3,154 @@ Pre-convert STEP files to GLB format using cascadio or pythonocc-core.
 This script batch converts all STEP files to GLB for faster loading.
 
 Usage:
-    python preconvert_models.py
+    python preconvert_models.py [--force] [-j JOBS] [--manifest]
     
-This will convert all STEP files in the assets directory to GLB format.
+This will convert all STEP files in the assets directory to GLB format,
+skipping files whose GLB is already newer than the STEP file unless --force is given.
 The converted GLB files will be placed alongside the original STEP files.
+With --manifest, every served model is then converted into the cache and a
+manifest is written so the server can look converted paths up directly.
 Note: Requires cascadio or pythonocc-core to be installed.
 """
+import argparse
+import hashlib
+import os
 import pathlib
 import sys
 import logging
-from utils.model_converter import ModelConverter, STEP_SUPPORT_AVAILABLE, STEP_BACKEND
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.model_converter import ModelConverter, STEP_SUPPORT_AVAILABLE, STEP_BACKEND, is_placeholder_glb
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-def preconvert_all_models():
-    """Pre-convert all STEP files to GLB format."""
+_STEP_SUFFIXES = ('.step', '.stp', '.sldprt')
+_COPY_BUFFER_SIZE = 1 << 20  # 1 MB
+
+def _fast_copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """
+    Copy file contents only (generated GLBs don't need copy2's metadata).
+    Uses os.sendfile where available, otherwise a reused 1 MB buffer.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if hasattr(os, 'sendfile'):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                offset = 0
+                while remaining > 0:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+                return
+            except OSError:
+                # Not supported for this pair of files; restart with the buffered copy
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        
+        buffer = memoryview(bytearray(_COPY_BUFFER_SIZE))
+        while True:
+            n = fsrc.readinto(buffer)
+            if not n:
+                break
+            fdst.write(buffer[:n])
+
+def _link_or_copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """
+    Hardlink src to dst (no bytes written when both live on one filesystem),
+    falling back to a content copy across devices.
+    The new file is made under a temp name and renamed over dst, never rewritten in
+    place, so other names for dst's old inode keep their contents and workers storing
+    the same dst don't interleave.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    try:
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(src, tmp)
+        except OSError:
+            _fast_copy(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def _step_digest(step_file: pathlib.Path) -> str:
+    """Content hash of a STEP file, used to key converted output across runs."""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = memoryview(bytearray(_COPY_BUFFER_SIZE))
+    with open(step_file, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(buffer[:n])
+    return digest.hexdigest()
+
+def _convert_one(category: str, step_file: pathlib.Path, asset_root: pathlib.Path, cache_root: pathlib.Path, force: bool = False):
+    """
+    Convert one STEP file and copy the GLB next to it.
+    Runs in a worker process, so it builds its own converter.
+    Reuses an earlier conversion of identical STEP content from the
+    hash-keyed cache when there is one, unless force is set.
+    
+    Returns:
+        Tuple of (category, filename, error_message or None, status)
+    """
+    glb_file = step_file.with_suffix('.glb')
+    try:
+        hashed_path = cache_root / "glb_by_hash" / f"{_step_digest(step_file)}.glb"
+        if not force and hashed_path.exists():
+            _link_or_copy(hashed_path, glb_file)
+            return category, step_file.name, None, 'reused cached conversion'
+    except OSError as e:
+        return category, step_file.name, f"Failed to check cached output: {e}", None
+    
+    converter = ModelConverter(asset_root, cache_root)
+    converted_path, error = converter.convert_component_model(
+        category=category,
+        filename=step_file.name,
+        output_format='glb',
+        force_reconvert=force
+    )
+    if error or not converted_path:
+        return category, step_file.name, error or 'Unknown error', None
+    
+    # Copy the converted file to the assets directory alongside the STEP file
+    try:
+        _link_or_copy(converted_path, glb_file)
+    except Exception as e:
+        return category, step_file.name, f"Failed to copy to assets: {e}", None
+    
+    # Remember real conversions (not placeholders) by content for later runs
+    try:
+        if not is_placeholder_glb(converted_path):
+            hashed_path.parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(converted_path, hashed_path)
+    except OSError as e:
+        logger.warning(f"Could not cache conversion of {category}/{step_file.name}: {e}")
+    return category, step_file.name, None, 'converted'
+
+def _is_up_to_date(step_file: pathlib.Path) -> bool:
+    """True if the sibling GLB is a real conversion at least as new as the STEP file."""
+    glb_file = step_file.with_suffix('.glb')
+    try:
+        glb_stat = glb_file.stat()
+    except FileNotFoundError:
+        return False
+    return glb_stat.st_mtime >= step_file.stat().st_mtime and not is_placeholder_glb(glb_file, glb_stat)
+
+def preconvert_all_models(force: bool = False, jobs: Optional[int] = None):
+    """
+    Pre-convert all STEP files to GLB format.
+    
+    Args:
+        force: Reconvert every file, ignoring up-to-date GLBs and all cached conversions
+        jobs: Number of worker processes (default: one per CPU)
+    """
     backend_dir = pathlib.Path(__file__).parent
     asset_root = backend_dir / "assets"
     cache_root = backend_dir / "assets-cache"
@@ -27,23 +159,37 @@ def preconvert_all_models():
         logger.error(f"Assets directory not found: {asset_root}")
         return False
     
-    converter = ModelConverter(asset_root, cache_root)
-    
     # Find all STEP files
+    # scandir entries answer is_dir/is_file from the directory read, so only
+    # matching files become Path objects
     step_files = []
-    for category_dir in asset_root.iterdir():
-        if not category_dir.is_dir():
-            continue
-        
-        for file_path in category_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in {'.step', '.stp', '.sldprt'}:
-                step_files.append((category_dir.name, file_path))
+    with os.scandir(asset_root) as categories:
+        for category_entry in categories:
+            if not category_entry.is_dir():
+                continue
+            
+            with os.scandir(category_entry.path) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(_STEP_SUFFIXES) and entry.is_file():
+                        step_files.append((category_entry.name, pathlib.Path(entry.path)))
     
     if not step_files:
         logger.info("No STEP files found to convert")
         return True
     
-    logger.info(f"Found {len(step_files)} STEP file(s) to convert")
+    logger.info(f"Found {len(step_files)} STEP file(s)")
+    
+    if not force:
+        pending = [(category, step_file) for category, step_file in step_files if not _is_up_to_date(step_file)]
+        skipped = len(step_files) - len(pending)
+        if skipped:
+            logger.info(f"Skipping {skipped} file(s) with an up-to-date GLB (use --force to reconvert)")
+        step_files = pending
+        if not step_files:
+            logger.info("All GLB files are up to date")
+            return True
+    
+    logger.info(f"Converting {len(step_files)} STEP file(s)")
     
     if not STEP_SUPPORT_AVAILABLE:
         logger.warning("=" * 60)
@@ -66,30 +212,26 @@ def preconvert_all_models():
     success_count = 0
     failed_count = 0
     
-    for category, step_file in step_files:
-        logger.info(f"Converting: {category}/{step_file.name}")
-        
-        # Convert to GLB
-        converted_path, error = converter.convert_component_model(
-            category=category,
-            filename=step_file.name,
-            output_format='glb'
-        )
-        
-        if error or not converted_path:
-            logger.error(f"  Failed: {error or 'Unknown error'}")
-            failed_count += 1
-        else:
-            # Copy the converted file to the assets directory alongside the STEP file
-            glb_file = step_file.with_suffix('.glb')
+    # STEP meshing is CPU-bound, so convert files in parallel worker processes
+    workers = max(1, min(len(step_files), jobs or os.cpu_count() or 1))
+    logger.info(f"Converting with {workers} worker process(es)")
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_convert_one, category, step_file, asset_root, cache_root, force): (category, step_file.name)
+            for category, step_file in step_files
+        }
+        for future in as_completed(futures):
             try:
-                import shutil
-                shutil.copy2(converted_path, glb_file)
-                logger.info(f"  Success: Created {glb_file.name}")
-                success_count += 1
+                category, filename, error, status = future.result()
             except Exception as e:
-                logger.error(f"  Failed to copy to assets: {e}")
+                (category, filename), error = futures[future], str(e)
+            if error:
+                logger.error(f"  Failed: {category}/{filename}: {error}")
                 failed_count += 1
+            else:
+                logger.info(f"  Success: {category}/{pathlib.Path(filename).with_suffix('.glb').name} ({status})")
+                success_count += 1
     
     logger.info("")
     logger.info("=" * 60)
@@ -99,6 +241,14 @@ def preconvert_all_models():
     return failed_count == 0
 
 if __name__ == "__main__":
-    success = preconvert_all_models()
+    parser = argparse.ArgumentParser(description="Pre-convert STEP files to GLB format.")
+    parser.add_argument('--force', action='store_true', help="reconvert every file, ignoring up-to-date GLBs and cached conversions")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--manifest', action='store_true', help="also write the server's converted-model manifest")
+    args = parser.parse_args()
+    success = preconvert_all_models(force=args.force, jobs=args.jobs)
+    if args.manifest:
+        backend_dir = pathlib.Path(__file__).parent
+        ModelConverter(backend_dir / "assets", backend_dir / "assets-cache").build_manifest()
     sys.exit(0 if success else 1)
 
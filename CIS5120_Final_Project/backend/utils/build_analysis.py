@@ -3,7 +3,9 @@ Utility functions for build analysis.
 Calculates performance metrics and flight time simulations.
 """
 import math
-from typing import List, Tuple
+import numpy as np
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from models.components import (
     DroneBuild,
     PerformanceMetrics,
@@ -25,67 +27,57 @@ def calculate_thrust_for_motor_prop_combo(motor, propeller) -> float:
     if not motor or not propeller:
         return 0.0
     
-    thrust_data = propeller.thrust_data
-    motor_kv = motor.kv
-    
-    # Find exact match
-    for data_point in thrust_data:
-        if data_point.kv == motor_kv:
-            return data_point.thrust
-    
-    # Interpolate between two closest KV values
-    sorted_data = sorted(thrust_data, key=lambda x: x.kv)
+    return _thrust_on_curve(motor.kv, propeller.thrust_curve)
+
+
+@lru_cache(maxsize=2048)
+def _thrust_on_curve(motor_kv: float, curve) -> float:
+    """
+    Thrust per motor at motor_kv on a propeller's thrust curve.
+    Memoized per (KV, curve): a curve belongs to one propeller instance, so catalog
+    propellers shared across requests reuse results while request-supplied ones never collide.
+    """
+    kvs, thrusts = curve.x, curve.y
     
     # If motor KV is below lowest data point
-    if motor_kv < sorted_data[0].kv:
+    if motor_kv < kvs[0]:
         # Extrapolate linearly (thrust scales roughly linearly with KV)
-        ratio = motor_kv / sorted_data[0].kv
-        return sorted_data[0].thrust * ratio
+        ratio = motor_kv / kvs[0]
+        return float(thrusts[0] * ratio)
     
     # If motor KV is above highest data point
-    if motor_kv > sorted_data[-1].kv:
-        ratio = motor_kv / sorted_data[-1].kv
-        return sorted_data[-1].thrust * ratio
-    
-    # Interpolate between two points
-    for i in range(len(sorted_data) - 1):
-        if sorted_data[i].kv <= motor_kv <= sorted_data[i + 1].kv:
-            # Linear interpolation
-            kv1, thrust1 = sorted_data[i].kv, sorted_data[i].thrust
-            kv2, thrust2 = sorted_data[i + 1].kv, sorted_data[i + 1].thrust
-            
-            t = (motor_kv - kv1) / (kv2 - kv1)
-            return thrust1 + t * (thrust2 - thrust1)
+    if motor_kv > kvs[-1]:
+        ratio = motor_kv / kvs[-1]
+        return float(thrusts[-1] * ratio)
     
-    return 0.0
+    # Exact match or linear interpolation between the two closest KV values
+    return float(np.interp(motor_kv, kvs, thrusts))
+
+
+def _component_quantities(build: DroneBuild, propeller_count: Optional[int] = None) -> List[Tuple[object, int]]:
+    """
+    (component, quantity) for every slot of the build, None for empty slots.
+    Motors (and propellers unless propeller_count is given) are counted per frame arm.
+    """
+    components = build.components
+    motor_count = components.frame.motor_count if components.frame else 4
+    return [
+        (components.frame, 1),
+        (components.motors, motor_count),
+        (components.propellers, motor_count if propeller_count is None else propeller_count),
+        (components.esc, 1),
+        (components.flight_controller, 1),
+        (components.battery, 1),
+        (components.receiver, 1),
+    ]
 
 
 def calculate_total_weight(build: DroneBuild) -> float:
     """Calculate total weight of the drone build in grams"""
     total = 0.0
-    
-    if build.components.frame:
-        total += build.components.frame.weight
-    
-    if build.components.motors:
-        motor_count = build.components.frame.motor_count if build.components.frame else 4
-        total += build.components.motors.weight * motor_count
-    
-    if build.components.propellers:
-        motor_count = build.components.frame.motor_count if build.components.frame else 4
-        total += build.components.propellers.weight * motor_count
-    
-    if build.components.esc:
-        total += build.components.esc.weight
-    
-    if build.components.flight_controller:
-        total += build.components.flight_controller.weight
-    
-    if build.components.battery:
-        total += build.components.battery.weight
-    
-    if build.components.receiver:
-        total += build.components.receiver.weight
+    for component, quantity in _component_quantities(build):
+        if component:
+            total += component.weight * quantity
     
     # Add estimated weight for wiring, screws, camera, etc. (~50g)
     total += 50
@@ -112,6 +104,7 @@ def calculate_max_thrust(build: DroneBuild) -> float:
 def calculate_current_at_throttle(motor, throttle: float) -> float:
     """
     Calculate current draw for a motor at given throttle
+    (also accepts an array of throttles and returns an array)
     """
     if not motor:
         return 0.0
@@ -178,10 +171,19 @@ def get_thrust_rating(ratio: float) -> ThrustRating:
         return ThrustRating.EXCELLENT
 
 
-def calculate_performance_metrics(build: DroneBuild) -> PerformanceMetrics:
-    """Calculate all performance metrics"""
-    total_weight = calculate_total_weight(build)
-    max_thrust = calculate_max_thrust(build)
+def calculate_performance_metrics(
+    build: DroneBuild,
+    total_weight: Optional[float] = None,
+    max_thrust: Optional[float] = None
+) -> PerformanceMetrics:
+    """
+    Calculate all performance metrics
+    total_weight/max_thrust may be passed in when the caller already computed them
+    """
+    if total_weight is None:
+        total_weight = calculate_total_weight(build)
+    if max_thrust is None:
+        max_thrust = calculate_max_thrust(build)
     
     # Thrust-to-weight ratio
     twr = max_thrust / total_weight if total_weight > 0 else 0.0
@@ -201,6 +203,13 @@ def calculate_performance_metrics(build: DroneBuild) -> PerformanceMetrics:
     )
 
 
+# Fixed 0%..100% throttle grid (10% steps) for the throttle profile, with its squares precomputed
+_PROFILE_THROTTLES = np.arange(0, 101, 10) / 100.0
+_PROFILE_THROTTLES_SQUARED = _PROFILE_THROTTLES ** 2
+_PROFILE_THROTTLES.flags.writeable = False
+_PROFILE_THROTTLES_SQUARED.flags.writeable = False
+
+
 def calculate_throttle_profile(build: DroneBuild) -> List[ThrottleProfilePoint]:
     """
     Generate throttle profile showing thrust, current, and power at different throttle levels
@@ -208,7 +217,6 @@ def calculate_throttle_profile(build: DroneBuild) -> List[ThrottleProfilePoint]:
     if not build.components.motors or not build.components.propellers or not build.components.battery:
         return []
     
-    profile = []
     motor_count = build.components.frame.motor_count if build.components.frame else 4
     thrust_per_motor = calculate_thrust_for_motor_prop_combo(
         build.components.motors,
@@ -216,50 +224,46 @@ def calculate_throttle_profile(build: DroneBuild) -> List[ThrottleProfilePoint]:
     )
     voltage = build.components.battery.voltage
     
-    # Generate points from 0% to 100% throttle
-    for throttle_pct in range(0, 101, 10):
-        throttle = throttle_pct / 100.0
-        
-        # Thrust scales roughly linearly with throttle^2
-        thrust = thrust_per_motor * motor_count * (throttle ** 2)
-        
-        # Current calculation
-        current_per_motor = calculate_current_at_throttle(build.components.motors, throttle)
-        total_current = current_per_motor * motor_count
-        
-        # Add system current
-        system_current = 0.5
-        if build.components.receiver:
-            system_current += build.components.receiver.current_draw / 1000.0
-        
-        total_current += system_current
-        
-        # Power
-        power = voltage * total_current
-        
-        profile.append(ThrottleProfilePoint(
+    # Evaluate all points from 0% to 100% throttle at once
+    throttles = _PROFILE_THROTTLES
+    
+    # Thrust scales roughly linearly with throttle^2
+    thrusts = thrust_per_motor * motor_count * _PROFILE_THROTTLES_SQUARED
+    
+    # Current calculation
+    currents_per_motor = calculate_current_at_throttle(build.components.motors, throttles)
+    total_currents = currents_per_motor * motor_count
+    
+    # Add system current
+    system_current = 0.5
+    if build.components.receiver:
+        system_current += build.components.receiver.current_draw / 1000.0
+    
+    total_currents += system_current
+    
+    # Power
+    powers = voltage * total_currents
+    
+    # tolist() hands back plain floats; round() them (np.round differs at decimal ties)
+    return [
+        ThrottleProfilePoint(
             throttle=round(throttle, 2),
             thrust=round(thrust, 1),
-            current=round(total_current, 2),
+            current=round(current, 2),
             power=round(power, 2)
-        ))
-    
-    return profile
+        )
+        for throttle, thrust, current, power in zip(
+            throttles.tolist(), thrusts.tolist(), total_currents.tolist(), powers.tolist()
+        )
+    ]
 
 
-def calculate_flight_time(build: DroneBuild, avg_throttle: float = 0.5) -> Tuple[float, float]:
-    """
-    Calculate estimated flight time and current draw
-    Returns: (flight_time_minutes, avg_current_amps)
-    """
-    if not build.components.battery or not build.components.motors:
-        return 0.0, 0.0
-    
-    battery_capacity = build.components.battery.capacity
+def _average_current(build: DroneBuild, throttle: float) -> float:
+    """Total current draw in amps (motors + system) at a given throttle"""
     motor_count = build.components.frame.motor_count if build.components.frame else 4
     
-    # Current per motor at average throttle
-    current_per_motor = calculate_current_at_throttle(build.components.motors, avg_throttle)
+    # Current per motor at the given throttle
+    current_per_motor = calculate_current_at_throttle(build.components.motors, throttle)
     total_motor_current = current_per_motor * motor_count
     
     # Add system current
@@ -267,13 +271,28 @@ def calculate_flight_time(build: DroneBuild, avg_throttle: float = 0.5) -> Tuple
     if build.components.receiver:
         system_current += build.components.receiver.current_draw / 1000.0
     
-    avg_current = total_motor_current + system_current
-    
+    return total_motor_current + system_current
+
+
+def _flight_time_from_current(battery_capacity: float, avg_current: float) -> float:
+    """Unrounded flight time in minutes for a battery (mAh) at a constant current draw (A)"""
     # Flight time = (capacity * 0.8) / (current * 1000) * 60
     # 0.8 factor accounts for not fully discharging the battery (safety margin)
     usable_capacity = battery_capacity * 0.8
     flight_time_hours = usable_capacity / (avg_current * 1000)
-    flight_time_minutes = flight_time_hours * 60
+    return flight_time_hours * 60
+
+
+def calculate_flight_time(build: DroneBuild, avg_throttle: float = 0.5) -> Tuple[float, float]:
+    """
+    Calculate estimated flight time and current draw
+    Returns: (flight_time_minutes, avg_current_amps)
+    """
+    if not build.components.battery or not build.components.motors:
+        return 0.0, 0.0
+    
+    avg_current = _average_current(build, avg_throttle)
+    flight_time_minutes = _flight_time_from_current(build.components.battery.capacity, avg_current)
     
     return round(flight_time_minutes, 1), round(avg_current, 2)
 
@@ -285,13 +304,19 @@ def calculate_range(flight_time_minutes: float, avg_speed_kmh: float = 45) -> fl
     return round(range_km, 2)
 
 
-def calculate_hover_time(build: DroneBuild) -> float:
+def calculate_hover_time(
+    build: DroneBuild,
+    total_weight: Optional[float] = None,
+    max_thrust: Optional[float] = None
+) -> float:
     """Calculate hover time at minimum throttle to maintain altitude"""
     if not build.components.battery or not build.components.motors:
         return 0.0
     
-    total_weight = calculate_total_weight(build)
-    max_thrust = calculate_max_thrust(build)
+    if total_weight is None:
+        total_weight = calculate_total_weight(build)
+    if max_thrust is None:
+        max_thrust = calculate_max_thrust(build)
     
     if max_thrust == 0:
         return 0.0
@@ -301,7 +326,8 @@ def calculate_hover_time(build: DroneBuild) -> float:
     hover_throttle = math.sqrt(total_weight / max_thrust)
     hover_throttle = min(hover_throttle, 1.0)  # Cap at 100%
     
-    hover_time, _ = calculate_flight_time(build, avg_throttle=hover_throttle)
+    hover_current = _average_current(build, hover_throttle)
+    hover_time = _flight_time_from_current(build.components.battery.capacity, hover_current)
     return round(hover_time, 1)
 
 
@@ -335,7 +361,6 @@ def generate_discharge_curve(
         return []
     
     battery = build.components.battery
-    discharge_profile = battery.discharge_profile
     
     # Generate more data points for better visualization
     # Use adaptive time step: smaller step for shorter flights, larger for longer
@@ -351,8 +376,6 @@ def generate_discharge_curve(
     if (flight_time_minutes / time_step) < min_points:
         time_step = flight_time_minutes / min_points
     
-    data_points = []
-    
     # Calculate usable capacity (80% for safety)
     usable_capacity_mah = battery.capacity * 0.8
     usable_flight_time = (usable_capacity_mah / (avg_current * 1000)) * 60  # minutes
@@ -361,43 +384,27 @@ def generate_discharge_curve(
     num_points = int(usable_flight_time / time_step) + 1
     num_points = max(num_points, min_points)  # Ensure minimum points
     
-    for i in range(num_points):
-        time = i * time_step
-        
-        # Don't exceed the usable flight time
-        if time > usable_flight_time:
-            break
-        
-        # Calculate remaining capacity
-        discharged_mah = avg_current * 1000 * (time / 60.0)
-        remaining_capacity = battery.capacity - discharged_mah
-        remaining_percentage = (remaining_capacity / battery.capacity) * 100
-        
-        # Stop if we've reached the safety limit (20%)
-        if remaining_percentage < 20:
-            break
-        
-        # Interpolate voltage from discharge profile
-        voltage = interpolate_voltage(discharge_profile, remaining_percentage)
-        
-        # Current draw varies slightly as voltage drops (constant power assumption)
-        # I = P/V, so as V drops, I increases slightly
-        nominal_voltage = battery.voltage
-        adjusted_current = avg_current * (nominal_voltage / voltage) if voltage > 0 else avg_current
-        
-        data_points.append(DischargeDataPoint(
-            time=round(time / 60, 3),  # Convert to hours for X-axis
-            voltage=round(voltage, 2),
-            remaining_capacity=round(remaining_capacity, 1),
-            current_draw=round(adjusted_current, 2)
-        ))
+    times, voltages, remaining, currents = _discharge_series(
+        battery, avg_current, time_step, usable_flight_time, num_points
+    )
+    
+    # tolist() hands back plain floats; round() them (np.round differs at decimal ties)
+    data_points = [
+        DischargeDataPoint(
+            time=round(t / 60, 3),  # Convert to hours for X-axis
+            voltage=round(v, 2),
+            remaining_capacity=round(c, 1),
+            current_draw=round(a, 2)
+        )
+        for t, v, c, a in zip(times.tolist(), voltages.tolist(), remaining.tolist(), currents.tolist())
+    ]
     
     # Ensure we have at least some data points even for edge cases
     if len(data_points) == 0 and battery.capacity > 0:
         # Add just the starting point
         data_points.append(DischargeDataPoint(
             time=0.0,
-            voltage=round(interpolate_voltage(discharge_profile, 100), 2),
+            voltage=round(interpolate_voltage(battery, 100), 2),
             remaining_capacity=round(battery.capacity, 1),
             current_draw=round(avg_current, 2)
         ))
@@ -405,26 +412,54 @@ def generate_discharge_curve(
     return data_points
 
 
-def interpolate_voltage(discharge_profile, percentage: float) -> float:
-    """Interpolate voltage from discharge profile"""
-    for i in range(len(discharge_profile) - 1):
-        p1 = discharge_profile[i]
-        p2 = discharge_profile[i + 1]
-        
-        if p2.percentage <= percentage <= p1.percentage:
-            # Linear interpolation
-            t = (percentage - p2.percentage) / (p1.percentage - p2.percentage)
-            voltage = p2.voltage + t * (p1.voltage - p2.voltage)
-            return voltage
+def _discharge_series(battery, avg_current: float, time_step: float, usable_flight_time: float, num_points: int):
+    """
+    Array form of the discharge simulation: time (minutes), voltage, remaining
+    capacity (mAh) and current draw for every sample, evaluated in one pass and
+    truncated at the first sample past the usable flight time or below 20% remaining.
+    """
+    times = np.arange(num_points) * time_step
+    
+    # Calculate remaining capacity
+    discharged_mah = avg_current * 1000 * (times / 60.0)
+    remaining_capacity = battery.capacity - discharged_mah
+    with np.errstate(divide='ignore', invalid='ignore'):
+        remaining_percentage = (remaining_capacity / battery.capacity) * 100
     
-    # If percentage is outside range, return closest value
-    if percentage >= discharge_profile[0].percentage:
-        return discharge_profile[0].voltage
-    return discharge_profile[-1].voltage
+    # Don't exceed the usable flight time, and stop at the safety limit (20%)
+    keep = (times <= usable_flight_time) & (remaining_percentage >= 20)
+    count = len(keep) if keep.all() else int(np.argmin(keep))
+    times = times[:count]
+    remaining_capacity = remaining_capacity[:count]
+    
+    # Interpolate voltage from discharge profile
+    curve = battery.discharge_curve
+    voltages = np.interp(remaining_percentage[:count], curve.x, curve.y)
+    
+    # Current draw varies slightly as voltage drops (constant power assumption)
+    # I = P/V, so as V drops, I increases slightly
+    nominal_voltage = battery.voltage
+    with np.errstate(divide='ignore'):
+        adjusted_current = np.where(voltages > 0, avg_current * (nominal_voltage / voltages), avg_current)
+    
+    return times, voltages, remaining_capacity, adjusted_current
 
 
-def calculate_flight_simulation(build: DroneBuild) -> FlightSimulation:
-    """Calculate enhanced flight simulation"""
+def interpolate_voltage(battery, percentage: float) -> float:
+    """Interpolate voltage from the battery's discharge profile (clamped to its end points)"""
+    curve = battery.discharge_curve
+    return float(np.interp(percentage, curve.x, curve.y))
+
+
+def calculate_flight_simulation(
+    build: DroneBuild,
+    total_weight: Optional[float] = None,
+    max_thrust: Optional[float] = None
+) -> FlightSimulation:
+    """
+    Calculate enhanced flight simulation
+    total_weight/max_thrust may be passed in when the caller already computed them
+    """
     if not build.components.battery:
         return FlightSimulation(
             battery_capacity=0,
@@ -440,11 +475,13 @@ def calculate_flight_simulation(build: DroneBuild) -> FlightSimulation:
         )
     
     # Calculate flight metrics
-    flight_time, avg_current = calculate_flight_time(build, avg_throttle=0.5)
-    hover_time = calculate_hover_time(build)
+    if total_weight is None:
+        total_weight = calculate_total_weight(build)
+    if max_thrust is None:
+        max_thrust = calculate_max_thrust(build)
     
-    total_weight = calculate_total_weight(build)
-    max_thrust = calculate_max_thrust(build)
+    flight_time, avg_current = calculate_flight_time(build, avg_throttle=0.5)
+    hover_time = calculate_hover_time(build, total_weight, max_thrust)
     
     avg_speed = 45.0  # km/h for sport flying
     max_speed = calculate_max_speed(total_weight, max_thrust)
@@ -547,29 +584,10 @@ def validate_build(build: DroneBuild) -> Tuple[bool, List[str], List[str]]:
 def calculate_total_cost(build: DroneBuild) -> float:
     """Calculate total cost of the build"""
     total = 0.0
-    
-    if build.components.frame:
-        total += build.components.frame.price
-    
-    if build.components.motors:
-        motor_count = build.components.frame.motor_count if build.components.frame else 4
-        total += build.components.motors.price * motor_count
-    
-    if build.components.propellers:
-        # Usually buy in sets of 4 (or 8 for spares)
-        total += build.components.propellers.price * 4
-    
-    if build.components.esc:
-        total += build.components.esc.price
-    
-    if build.components.flight_controller:
-        total += build.components.flight_controller.price
-    
-    if build.components.battery:
-        total += build.components.battery.price
-    
-    if build.components.receiver:
-        total += build.components.receiver.price
+    # Propellers usually come in sets of 4 (or 8 for spares)
+    for component, quantity in _component_quantities(build, propeller_count=4):
+        if component:
+            total += component.price * quantity
     
     return round(total, 2)
 
@@ -583,8 +601,11 @@ def analyze_build(build: DroneBuild) -> BuildAnalysis:
     
     # Only calculate if build has minimum required components
     if build.components.motors and build.components.battery and build.components.propellers:
-        performance = calculate_performance_metrics(build)
-        flight_sim = calculate_flight_simulation(build)
+        # Weight and thrust feed both the metrics and the simulation; compute them once
+        total_weight = calculate_total_weight(build)
+        max_thrust = calculate_max_thrust(build)
+        performance = calculate_performance_metrics(build, total_weight, max_thrust)
+        flight_sim = calculate_flight_simulation(build, total_weight, max_thrust)
     else:
         # Return empty metrics if incomplete
         performance = PerformanceMetrics(
@@ -1,15 +1,20 @@
 """
 Utility functions for component data handling.
 """
-import json
+import mmap
+import os
+import threading
+import orjson
 from pathlib import Path
 from typing import List, Dict, Optional
+from pydantic import TypeAdapter
 from models.components import (
     Motor, Propeller, ESC, FlightController,
     Frame, Battery, Receiver,
     ComponentDatabase, DroneBuild, DroneBuildConfig,
     DroneComponents
 )
+from utils.file_lock import locked, write_atomic
 
 # Path to JSON data files (for development/testing)
 # In production, this would come from a database
@@ -25,19 +30,36 @@ BUILDS_FILE = DATA_DIR / "builds.json"
 def _load_json(path: Path, default):
     if not path.exists():
         return default
-    with open(path, "r") as f:
-        return json.load(f)
+    return _parse_json_file(path)
+
+# Above this size, parse straight from the page cache instead of copying into a bytes object
+_MMAP_THRESHOLD = 256 * 1024
+
+def _parse_json_file(path: Path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= _MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
 
 def _save_json(path: Path, obj) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(obj, f, indent=2)
+    write_atomic(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+
+def file_stamp(path: Path):
+    """(mtime_ns, size) of a data file, or None if it doesn't exist; used to invalidate in-memory caches"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
 def _ensure_component_ids(build: dict) -> dict:
     """
     Ensure the build dict contains a nested 'componentIds' object.
     If missing (legacy flat schema), derive it from flat keys.
     Does NOT remove flat keys (harmless); you can strip them later if desired.
+    Legacy rows are normalized in place; every caller passes a dict it just parsed or dumped.
     """
     if not isinstance(build, dict):
         return build
@@ -49,7 +71,6 @@ def _ensure_component_ids(build: dict) -> dict:
     # Accept legacy alternatives for FC
     fc_id = build.get("flightControllerId") or build.get("fcId")
 
-    build = dict(build)  # shallow copy to avoid side effects
     build["componentIds"] = {
         "frameId": build.get("frameId"),
         "motorId": build.get("motorId"),
@@ -78,116 +99,156 @@ def load_all_components() -> Dict:
             "batteries": [],
             "receivers": []
         }
-    with open(COMPONENTS_FILE, 'r') as f:
-        return json.load(f)
+    return _parse_json_file(COMPONENTS_FILE)
+
+# Component type (as used by get_component_by_id) -> (components.json key, model)
+COMPONENT_TYPES = {
+    "motor": ("motors", Motor),
+    "propeller": ("propellers", Propeller),
+    "esc": ("escs", ESC),
+    "flight_controller": ("flight_controllers", FlightController),
+    "frame": ("frames", Frame),
+    "battery": ("batteries", Battery),
+    "receiver": ("receivers", Receiver),
+}
+
+# One compiled list validator per component type; validating a whole list in
+# pydantic-core is several times faster than per-item construction in Python
+_COMPONENT_LIST_ADAPTERS = {
+    component_type: TypeAdapter(List[model])
+    for component_type, (_, model) in COMPONENT_TYPES.items()
+}
+
+_catalog = {"stamp": None, "lists": None, "index": None, "db": None}
+_catalog_lock = threading.Lock()
+
+def _component_catalog() -> dict:
+    """
+    Validated catalog models per type (file order), an id index and the
+    assembled ComponentDatabase, rebuilt only when components.json changes.
+    Catalog models are frozen, so every request can share the same instances.
+    """
+    stamp = file_stamp(COMPONENTS_FILE)
+    if _catalog["lists"] is not None and _catalog["stamp"] == stamp:
+        return _catalog
+    # Handlers call in from worker threads; rebuild once, and publish the stamp
+    # last so a concurrent reader never pairs the new stamp with old data
+    with _catalog_lock:
+        if _catalog["lists"] is not None and _catalog["stamp"] == stamp:
+            return _catalog
+        data = load_all_components()
+        lists = {}
+        index = {}
+        for component_type, (key, _) in COMPONENT_TYPES.items():
+            components = _COMPONENT_LIST_ADAPTERS[component_type].validate_python(data.get(key, []))
+            by_id = {}
+            for component in components:
+                by_id.setdefault(component.id, component)  # first match wins, like the linear scan
+            lists[component_type] = components
+            index[component_type] = by_id
+        _catalog["lists"] = lists
+        _catalog["index"] = index
+        _catalog["db"] = ComponentDatabase.model_construct(
+            motors=lists["motor"],
+            propellers=lists["propeller"],
+            escs=lists["esc"],
+            flight_controllers=lists["flight_controller"],
+            frames=lists["frame"],
+            batteries=lists["battery"],
+            receivers=lists["receiver"]
+        )
+        _catalog["stamp"] = stamp
+    return _catalog
 
 def get_all_motors() -> List[Motor]:
-    data = load_all_components()
-    return [Motor(**item) for item in data.get("motors", [])]
+    return list(_component_catalog()["lists"]["motor"])
 
 def get_all_propellers() -> List[Propeller]:
-    data = load_all_components()
-    return [Propeller(**item) for item in data.get("propellers", [])]
+    return list(_component_catalog()["lists"]["propeller"])
 
 def get_all_escs() -> List[ESC]:
-    data = load_all_components()
-    return [ESC(**item) for item in data.get("escs", [])]
+    return list(_component_catalog()["lists"]["esc"])
 
 def get_all_flight_controllers() -> List[FlightController]:
-    data = load_all_components()
-    return [FlightController(**item) for item in data.get("flight_controllers", [])]
+    return list(_component_catalog()["lists"]["flight_controller"])
 
 def get_all_frames() -> List[Frame]:
-    data = load_all_components()
-    return [Frame(**item) for item in data.get("frames", [])]
+    return list(_component_catalog()["lists"]["frame"])
 
 def get_all_batteries() -> List[Battery]:
-    data = load_all_components()
-    return [Battery(**item) for item in data.get("batteries", [])]
+    return list(_component_catalog()["lists"]["battery"])
 
 def get_all_receivers() -> List[Receiver]:
-    data = load_all_components()
-    return [Receiver(**item) for item in data.get("receivers", [])]
+    return list(_component_catalog()["lists"]["receiver"])
 
 def get_all_components_db() -> ComponentDatabase:
     """Get all components in a structured format"""
-    return ComponentDatabase(
-        motors=get_all_motors(),
-        propellers=get_all_propellers(),
-        escs=get_all_escs(),
-        flight_controllers=get_all_flight_controllers(),
-        frames=get_all_frames(),
-        batteries=get_all_batteries(),
-        receivers=get_all_receivers()
-    )
+    return _component_catalog()["db"]
 
 def get_component_by_id(component_type: str, component_id: str):
     """Get a specific component by type and ID"""
-    component_getters = {
-        "motor": get_all_motors,
-        "propeller": get_all_propellers,
-        "esc": get_all_escs,
-        "flight_controller": get_all_flight_controllers,
-        "frame": get_all_frames,
-        "battery": get_all_batteries,
-        "receiver": get_all_receivers
-    }
-    getter = component_getters.get(component_type)
-    if not getter:
+    components = _component_catalog()["index"].get(component_type)
+    if components is None:
         return None
-    for component in getter():
-        if component.id == component_id:
-            return component
-    return None
-
+    return components.get(component_id)
 
-def get_all_saved_builds() -> List[DroneBuildConfig]:
+def get_component_index() -> Dict[str, Dict[str, object]]:
     """
-    Get all saved build configurations.
-    Normalizes legacy rows to include a nested 'componentIds' object.
+    Map component type -> {id: component}.
+    Hydration looks components up here instead of scanning the catalog per ID.
     """
-    builds_data = _load_json(BUILDS_FILE, default=[])
-    normalized = [_ensure_component_ids(b) for b in builds_data]
-    return [DroneBuildConfig(**b) for b in normalized]
-
-def hydrate_build(build_config: DroneBuildConfig) -> Optional[DroneBuild]:
-    """
-    Convert a build configuration (with component IDs) into a full build
-    (with complete component objects) for analysis
-    """
-    components = DroneComponents()
-
-    # Frame
-    if build_config.component_ids.frame_id:
-        components.frame = get_component_by_id("frame", build_config.component_ids.frame_id)
+    return _component_catalog()["index"]
 
-    # Motor (NOTE: if DroneComponents.motors expects a list, wrap it)
-    if build_config.component_ids.motor_id:
-        motor = get_component_by_id("motor", build_config.component_ids.motor_id)
-        components.motors = motor  # or [motor] if your model expects a list
 
-    # Propeller
-    if build_config.component_ids.propeller_id:
-        prop = get_component_by_id("propeller", build_config.component_ids.propeller_id)
-        components.propellers = prop  # or [prop]
+_SAVED_BUILDS_ADAPTER = TypeAdapter(List[DroneBuildConfig])
 
-    # ESC
-    if build_config.component_ids.esc_id:
-        components.esc = get_component_by_id("esc", build_config.component_ids.esc_id)
+_saved_builds = {"stamp": None, "builds": None, "by_id": None}
+_saved_builds_lock = threading.Lock()
 
-    # Flight controller
-    if build_config.component_ids.flight_controller_id:
-        components.flight_controller = get_component_by_id("flight_controller", build_config.component_ids.flight_controller_id)
-
-    # Battery
-    if build_config.component_ids.battery_id:
-        components.battery = get_component_by_id("battery", build_config.component_ids.battery_id)
-
-    # Receiver
-    if build_config.component_ids.receiver_id:
-        components.receiver = get_component_by_id("receiver", build_config.component_ids.receiver_id)
+def _saved_build_store() -> dict:
+    """
+    In-memory view of builds.json: validated configs in file order plus an id index.
+    Re-read only when the file's mtime/size changes (saves from any worker bump it).
+    """
+    stamp = file_stamp(BUILDS_FILE)
+    if _saved_builds["builds"] is not None and _saved_builds["stamp"] == stamp:
+        return _saved_builds
+    with _saved_builds_lock:
+        if _saved_builds["builds"] is not None and _saved_builds["stamp"] == stamp:
+            return _saved_builds
+        builds_data = _load_json(BUILDS_FILE, default=[])
+        builds = _SAVED_BUILDS_ADAPTER.validate_python([_ensure_component_ids(b) for b in builds_data])
+        by_id = {}
+        for build in builds:
+            by_id.setdefault(build.id, build)  # first row wins, as the old linear scan did
+        _saved_builds["builds"] = builds
+        _saved_builds["by_id"] = by_id
+        _saved_builds["stamp"] = stamp
+    return _saved_builds
 
-    return DroneBuild(
+def get_all_saved_builds() -> List[DroneBuildConfig]:
+    """
+    Get all saved build configurations.
+    Normalizes legacy rows to include a nested 'componentIds' object.
+    """
+    return list(_saved_build_store()["builds"])
+
+def get_saved_build_by_id(build_id: str) -> Optional[DroneBuildConfig]:
+    """Get a single saved build configuration by ID"""
+    return _saved_build_store()["by_id"].get(build_id)
+
+def _hydrate(build_config: DroneBuildConfig, index: Dict[str, Dict[str, object]]) -> DroneBuild:
+    ids = build_config.component_ids
+    components = DroneComponents.model_construct(
+        frame=index["frame"].get(ids.frame_id),
+        motors=index["motor"].get(ids.motor_id),
+        propellers=index["propeller"].get(ids.propeller_id),
+        esc=index["esc"].get(ids.esc_id),
+        flight_controller=index["flight_controller"].get(ids.flight_controller_id),
+        battery=index["battery"].get(ids.battery_id),
+        receiver=index["receiver"].get(ids.receiver_id)
+    )
+    return DroneBuild.model_construct(
         id=build_config.id,
         name=build_config.name,
         description=build_config.description,
@@ -196,13 +257,24 @@ def hydrate_build(build_config: DroneBuildConfig) -> Optional[DroneBuild]:
         updated_at=build_config.updated_at
     )
 
+def hydrate_build(build_config: DroneBuildConfig) -> Optional[DroneBuild]:
+    """
+    Convert a build configuration (with component IDs) into a full build
+    (with complete component objects) for analysis.
+    Components come from our own catalog, so the result is constructed without re-validation.
+    """
+    return _hydrate(build_config, get_component_index())
+
+def hydrate_builds(build_configs: List[DroneBuildConfig]) -> List[DroneBuild]:
+    """Hydrate many build configurations against a single catalog index"""
+    index = get_component_index()
+    return [_hydrate(build_config, index) for build_config in build_configs]
+
 def save_build(build_config: DroneBuildConfig) -> bool:
     """
     Save a build configuration to file.
     Always writes the nested 'componentIds' shape (aliases) so future reads parse cleanly.
     """
-    builds = _load_json(BUILDS_FILE, default=[])
-
     # Convert to dict using field aliases (camelCase), then ensure nested componentIds
     build_dict = build_config.model_dump(by_alias=True)
 
@@ -215,23 +287,27 @@ def save_build(build_config: DroneBuildConfig) -> bool:
     # Normalize nested componentIds (in case model was constructed from legacy data)
     build_dict = _ensure_component_ids(build_dict)
 
-    # Update or append
-    existing_index = next((i for i, b in enumerate(builds) if b.get("id") == build_config.id), None)
-    if existing_index is not None:
-        builds[existing_index] = build_dict
-    else:
-        builds.append(build_dict)
+    with locked(BUILDS_FILE):
+        builds = _load_json(BUILDS_FILE, default=[])
+
+        # Update or append
+        existing_index = next((i for i, b in enumerate(builds) if b.get("id") == build_config.id), None)
+        if existing_index is not None:
+            builds[existing_index] = build_dict
+        else:
+            builds.append(build_dict)
 
-    _save_json(BUILDS_FILE, builds)
+        _save_json(BUILDS_FILE, builds)
     return True
 
 def delete_build(build_id: str) -> bool:
     """Delete a build configuration"""
     if not BUILDS_FILE.exists():
         return False
-    builds = _load_json(BUILDS_FILE, default=[])
-    new_builds = [b for b in builds if b.get("id") != build_id]
-    if len(new_builds) == len(builds):
-        return False  # not found
-    _save_json(BUILDS_FILE, new_builds)
+    with locked(BUILDS_FILE):
+        builds = _load_json(BUILDS_FILE, default=[])
+        new_builds = [b for b in builds if b.get("id") != build_id]
+        if len(new_builds) == len(builds):
+            return False  # not found
+        _save_json(BUILDS_FILE, new_builds)
     return True
@@ -0,0 +1,58 @@
+"""
+Cross-process locking and atomic replacement for the JSON data files.
+With several uvicorn workers, read-modify-write cycles on the same file must not interleave,
+and a reader must never see a half-written file.
+"""
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines run a single worker; nothing to coordinate
+    fcntl = None
+
+# The process umask, read once at import: querying it means setting it, and toggling
+# it per write would briefly clear it for files other threads create meanwhile
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+@contextlib.contextmanager
+def locked(path: Path):
+    """Hold an exclusive lock for `path` (via a sibling .lock file) for the duration of the block"""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Replace `path` with `data` in one step: write a temp file in the same directory,
+    fsync it, then os.replace it over the original (keeping the original's permissions).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
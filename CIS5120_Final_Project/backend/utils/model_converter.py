@@ -2,17 +2,61 @@
 Utility module for converting 3D model files to GLTF/GLB format.
 Supports STEP, STP, SLDPRT, and other CAD formats.
 """
+import math
+import os
 import pathlib
 import hashlib
-import trimesh
+import shutil
+import struct
+import threading
+import orjson
 import time
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import List, Optional, Tuple, Union
 import logging
+from utils.file_lock import write_atomic
 
 logger = logging.getLogger(__name__)
 
+# A positive cache-validity check skips the TTL and source checks for this long.
+# The cache file itself is still stat'ed every time: any worker may sweep or clear it.
+_VALIDITY_WINDOW_SECONDS = 5.0
+
+# Asset stat results (including "missing") are reused for this long
+_STAT_TTL_SECONDS = 1.0
+_STAT_CACHE_MAX_ENTRIES = 4096
+
+# Resolved (category, filename) -> asset path lookups are reused for this long
+_RESOLUTION_TTL_SECONDS = 5.0
+
+_NS_PER_HOUR = 3_600_000_000_000
+
+# Cache maintenance deletes with up to this many threads; unlinks are independent
+# and mostly wait on filesystem metadata updates
+_UNLINK_WORKERS = 8
+
+# Read size for hashing source files
+_HASH_BUFFER_SIZE = 1 << 20  # 1 MB
+
+# Precomputed "category/filename" -> converted file mapping, written by build_manifest()
+MANIFEST_NAME = "manifest.json"
+
+# Meshes with more faces than this are decimated down to it before export
+# (needs the optional fast-simplification package; otherwise exported as-is)
+SIMPLIFY_FACE_THRESHOLD = 50_000
+
+# GLB layout: 12-byte header (magic, version, length), then the JSON chunk (length, type, data)
+_GLB_MAGIC = b'glTF'
+_GLB_JSON_CHUNK = 0x4E4F534A
+# A trimesh placeholder box has 8 vertices; real component models have thousands
+_PLACEHOLDER_MAX_VERTICES = 24
+# Fallback for files without a readable GLB header: placeholders are tiny
+_PLACEHOLDER_MAX_BYTES = 10240
+
 # Supported input formats
-SUPPORTED_FORMATS = {'.step', '.stp', '.stl', '.obj', '.ply', '.off', '.dae', '.3mf', '.sldprt'}
+SUPPORTED_FORMATS = frozenset({'.step', '.stp', '.stl', '.obj', '.ply', '.off', '.dae', '.3mf', '.sldprt'})
 
 # Check for STEP file support backends
 STEP_SUPPORT_AVAILABLE = False
@@ -33,6 +77,236 @@ except ImportError:
     except ImportError:
         logger.warning("STEP file support: No backend available (cascadio or pythonocc-core required)")
 
+
+@lru_cache(maxsize=4096)
+def _cache_path_for(cache_root: str, source_path: str, output_format: str) -> pathlib.Path:
+    """Cache file for a source path; pure, so each (root, source, format) is hashed only once"""
+    # BLAKE2b truncated to 16 bytes: same 32-hex-char names as the old MD5 keys, but faster
+    path_hash = hashlib.blake2b(source_path.encode(), digest_size=16).hexdigest()
+    return pathlib.Path(cache_root) / f"{path_hash}.{output_format}"
+
+@lru_cache(maxsize=None)
+def _pythonocc() -> Optional[SimpleNamespace]:
+    """
+    The pythonocc-core symbols the STEP fallback uses, resolved once per process,
+    or None if pythonocc-core isn't installed (the fallback is tried even when
+    cascadio is the primary backend).
+    """
+    try:
+        from OCC.Core import STEPControl_Reader
+        from OCC.Core import IFSelect_ReturnStatus
+        from OCC.Core import BRepMesh_IncrementalMesh
+        from OCC.Core import TopExp
+        from OCC.Core import TopAbs
+        from OCC.Core import BRep_Tool
+        from OCC.Core import TopoDS
+        import numpy as np
+    except ImportError:
+        return None
+    # Bounding boxes size the meshing deflection; without them the fixed default is used
+    try:
+        from OCC.Core.Bnd import Bnd_Box
+        try:
+            from OCC.Core.BRepBndLib import brepbndlib
+            add_to_box = brepbndlib.Add
+        except ImportError:
+            from OCC.Core.BRepBndLib import brepbndlib_Add as add_to_box
+    except ImportError:
+        Bnd_Box = add_to_box = None
+    return SimpleNamespace(
+        Bnd_Box=Bnd_Box,
+        add_to_box=add_to_box,
+        STEPControl_Reader=STEPControl_Reader,
+        IFSelect_ReturnStatus=IFSelect_ReturnStatus,
+        BRepMesh_IncrementalMesh=BRepMesh_IncrementalMesh,
+        TopExp=TopExp,
+        TopAbs=TopAbs,
+        BRep_Tool=BRep_Tool,
+        TopoDS=TopoDS,
+        np=np
+    )
+
+def _simplify_if_dense(mesh):
+    """Reduce an oversized mesh to SIMPLIFY_FACE_THRESHOLD faces; anything else is returned unchanged"""
+    face_count = len(getattr(mesh, 'faces', ()))
+    if face_count <= SIMPLIFY_FACE_THRESHOLD:
+        return mesh
+    try:
+        simplified = mesh.simplify_quadric_decimation(face_count=SIMPLIFY_FACE_THRESHOLD)
+    except ImportError:
+        logger.info(f"Exporting {face_count} faces unsimplified (install fast-simplification to decimate)")
+        return mesh
+    except Exception as e:
+        logger.warning(f"Mesh simplification failed, exporting {face_count} faces: {e}")
+        return mesh
+    logger.info(f"Simplified mesh from {face_count} to {len(simplified.faces)} faces")
+    return simplified
+
+# STEP meshing: linear deflection as a fraction of the part's bounding-box diagonal
+_DEFLECTION_DEFAULT = 0.1
+_DEFLECTION_PER_DIAGONAL = 0.005
+_DEFLECTION_MIN = 1e-4
+
+def _linear_deflection(occ: SimpleNamespace, shape) -> float:
+    """
+    Meshing tolerance scaled to the part, so small parts (motors, screws) aren't
+    over-tessellated and large frames aren't under-tessellated.
+    """
+    if occ.Bnd_Box is None:
+        return _DEFLECTION_DEFAULT
+    try:
+        box = occ.Bnd_Box()
+        occ.add_to_box(shape, box)
+        xmin, ymin, zmin, xmax, ymax, zmax = box.Get()
+    except Exception as e:
+        logger.debug(f"Bounding box unavailable, using default deflection: {e}")
+        return _DEFLECTION_DEFAULT
+    diagonal = math.sqrt((xmax - xmin) ** 2 + (ymax - ymin) ** 2 + (zmax - zmin) ** 2)
+    if not math.isfinite(diagonal) or diagonal <= 0:
+        return _DEFLECTION_DEFAULT
+    return max(diagonal * _DEFLECTION_PER_DIAGONAL, _DEFLECTION_MIN)
+
+@lru_cache(maxsize=1024)
+def _glb_is_placeholder(path: str, mtime_ns: int, size: int) -> bool:
+    """Placeholder check for one version of a file (the stamp arguments key the memo)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(20)
+            if len(header) < 20 or header[:4] != _GLB_MAGIC:
+                return size <= _PLACEHOLDER_MAX_BYTES
+            json_length, chunk_type = struct.unpack('<II', header[12:20])
+            if chunk_type != _GLB_JSON_CHUNK or json_length > size:
+                return size <= _PLACEHOLDER_MAX_BYTES
+            gltf = orjson.loads(f.read(json_length))
+        accessors = gltf.get('accessors', [])
+        vertex_count = sum(
+            accessors[primitive['attributes']['POSITION']]['count']
+            for mesh in gltf.get('meshes', [])
+            for primitive in mesh.get('primitives', [])
+            if 'POSITION' in primitive.get('attributes', {})
+        )
+    except (OSError, ValueError, LookupError, TypeError, AttributeError):
+        return size <= _PLACEHOLDER_MAX_BYTES
+    return vertex_count <= _PLACEHOLDER_MAX_VERTICES
+
+def is_placeholder_glb(path: pathlib.Path, stat: Optional[os.stat_result] = None) -> bool:
+    """
+    True if a GLB is a placeholder box (or empty) rather than a real model.
+    Counts vertices from the GLB's JSON chunk instead of guessing from the file size;
+    files that aren't readable GLBs fall back to the old 10KB size check.
+    """
+    if stat is None:
+        stat = os.stat(path)
+    return _glb_is_placeholder(str(path), stat.st_mtime_ns, stat.st_size)
+
+def _temp_sibling(path: pathlib.Path) -> pathlib.Path:
+    """Hidden temp name next to path, unique per process and thread"""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def _export_bytes(mesh, output_format: str) -> bytes:
+    """
+    Encode a mesh in memory. glTF has its buffers embedded as data URIs so the model
+    is one self-contained file, rather than gltf_buffer_N.bin side files that every
+    conversion would write under the same names in the shared cache directory.
+    """
+    if output_format == 'gltf':
+        return mesh.export(file_type='gltf', embed_buffers=True)['model.gltf']
+    return mesh.export(file_type=output_format)
+
+def _export_atomic(mesh, cache_path: pathlib.Path, output_format: str) -> None:
+    """
+    Encode in memory, write the temp file in one call and rename it into place,
+    so readers never see a partial model
+    """
+    data = _export_bytes(mesh, output_format)
+    tmp_path = _temp_sibling(cache_path)
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# Kernel-side copy primitives, fastest first, as (src_fd, dst_fd, count) -> bytes copied
+_KERNEL_COPIES = []
+if hasattr(os, 'copy_file_range'):
+    _KERNEL_COPIES.append(lambda src_fd, dst_fd, count: os.copy_file_range(src_fd, dst_fd, count))
+if hasattr(os, 'sendfile'):
+    _KERNEL_COPIES.append(lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count))
+
+def _copy_contents(source_path: pathlib.Path, dest_path: pathlib.Path) -> None:
+    """
+    Copy file bytes without a userspace bounce where possible: copy_file_range (a
+    reflink on btrfs/XFS), then sendfile, then a plain buffered copy. Metadata isn't
+    copied, so a cache copy's mtime is its fill time and the TTL counts from then
+    (copy2 used to carry the asset's old mtime over, so old assets looked expired
+    and were re-copied on every request).
+    """
+    with open(source_path, 'rb') as fsrc, open(dest_path, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        for kernel_copy in _KERNEL_COPIES:
+            try:
+                copied = 0
+                while copied < size:
+                    n = kernel_copy(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+                return
+            except OSError:
+                # Not supported for this pair of files; restart with the next method
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+
+def _copy_atomic(source_path: pathlib.Path, cache_path: pathlib.Path) -> None:
+    """Copy a file into the cache through a temp file, for the same reason"""
+    tmp_path = _temp_sibling(cache_path)
+    try:
+        _copy_contents(source_path, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _content_digest(path: pathlib.Path) -> str:
+    """BLAKE2b of a file's contents; far cheaper than re-running a conversion"""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = memoryview(bytearray(_HASH_BUFFER_SIZE))
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(buffer[:n])
+    return digest.hexdigest()
+
+_SIDECAR_SUFFIX = ".sha"
+
+def _digest_sidecar(cache_path: pathlib.Path) -> pathlib.Path:
+    """Where the digest of the source a cached model was converted from is kept"""
+    return cache_path.with_name(cache_path.name + _SIDECAR_SUFFIX)
+
+def _unlink_all(entries: List[os.DirEntry], log_deletes: bool = False) -> int:
+    """Delete scandir entries on a small thread pool; returns how many were removed"""
+    def unlink(entry: os.DirEntry) -> bool:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            return False  # already removed by another worker's sweep
+        except Exception as e:
+            logger.error(f"Failed to delete cache file {entry.name}: {e}")
+            return False
+        if log_deletes:
+            logger.info(f"Deleted expired cache file: {entry.name}")
+        return True
+    
+    if len(entries) <= 1:
+        return sum(map(unlink, entries))
+    with ThreadPoolExecutor(max_workers=min(_UNLINK_WORKERS, len(entries))) as pool:
+        return sum(pool.map(unlink, entries))
+
 class ModelConverter:
     """Handles conversion of 3D model files to GLTF format with caching."""
     
@@ -49,6 +323,114 @@ class ModelConverter:
         self.cache_root = cache_root
         self.cache_ttl_hours = cache_ttl_hours
         self.cache_root.mkdir(parents=True, exist_ok=True)
+        # String forms for the per-request hot path (Path joins re-parse every segment)
+        self._asset_root_str = os.fspath(asset_root)
+        self._cache_root_str = os.fspath(cache_root)
+        # (source, cache) path strings -> monotonic time they were last found valid
+        self._validity_cache = {}
+        # asset path string -> (monotonic time, stat result or None if missing)
+        self._stat_cache = {}
+        # (category, filename) -> (monotonic time, resolved path or None)
+        self._resolution_cache = {}
+        # cache path string -> Event set when the conversion writing it finishes
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._manifest = self._load_manifest()
+    
+    def _cached_stat(self, path: Union[str, pathlib.Path]) -> Optional[os.stat_result]:
+        """
+        stat() an asset path, reusing a result younger than _STAT_TTL_SECONDS.
+        Returns None if the path doesn't exist (also cached, so repeated misses are cheap).
+        Assets are only written by preconvert_models.py, never by the converter itself.
+        """
+        key = str(path)
+        now = time.monotonic()
+        cached = self._stat_cache.get(key)
+        if cached is not None and now - cached[0] < _STAT_TTL_SECONDS:
+            return cached[1]
+        try:
+            stat = os.stat(key)
+        except (FileNotFoundError, NotADirectoryError):
+            stat = None
+        if len(self._stat_cache) >= _STAT_CACHE_MAX_ENTRIES:
+            self._stat_cache.clear()  # request paths come from URLs; keep this bounded
+        self._stat_cache[key] = (now, stat)
+        return stat
+    
+    def _load_manifest(self) -> dict:
+        """output format -> {"category/filename": converted path} from the cache's manifest, if any"""
+        try:
+            raw = orjson.loads((self.cache_root / MANIFEST_NAME).read_bytes())
+        except FileNotFoundError:
+            return {}
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable model manifest: {e}")
+            return {}
+        return {
+            output_format: {key: self.cache_root / path for key, path in entries.items()}
+            for output_format, entries in raw.items()
+        }
+    
+    def _pinned_names(self) -> set:
+        """
+        Cache entries the TTL sweep must keep: the manifest, the files it points to
+        and their digest sidecars. The manifest is re-read first, so one written by
+        preconvert_models.py after this process started is honoured too.
+        """
+        self._manifest = self._load_manifest()
+        names = {MANIFEST_NAME}
+        for entries in self._manifest.values():
+            for path in entries.values():
+                if path.parent == self.cache_root:
+                    names.add(path.name)
+                    names.add(_digest_sidecar(path).name)
+        return names
+    
+    def build_manifest(self, output_format: str = 'glb') -> dict:
+        """
+        Convert every model under asset_root and record where each result lives,
+        so requests for known assets become a lookup instead of a conversion check.
+        Rebuild it (e.g. with preconvert_models.py --manifest) whenever assets change.
+        
+        Args:
+            output_format: Output format to prepare ('glb' or 'gltf')
+        
+        Returns:
+            Mapping of "category/filename" -> converted path for this format
+        """
+        items = []
+        with os.scandir(self.asset_root) as categories:
+            for category in categories:
+                if not category.is_dir():
+                    continue
+                with os.scandir(category.path) as entries:
+                    for entry in entries:
+                        suffix = os.path.splitext(entry.name)[1].lower()
+                        if suffix in {'.step', '.stp', '.sldprt'} and not STEP_SUPPORT_AVAILABLE:
+                            continue  # would only pin a placeholder
+                        if (suffix in SUPPORTED_FORMATS or suffix == '.glb') and entry.is_file():
+                            items.append((category.name, entry.name))
+        
+        entries = {}
+        for (category, filename), (converted_path, error) in zip(items, self.convert_many(items, output_format)):
+            if error or not converted_path:
+                logger.warning(f"Leaving {category}/{filename} out of the manifest: {error or 'conversion failed'}")
+                continue
+            entries[f"{category}/{filename}"] = converted_path
+        
+        manifest = dict(self._manifest)
+        manifest[output_format] = entries
+        # Paths inside the cache are stored relative to it, so the manifest survives a move
+        write_atomic(self.cache_root / MANIFEST_NAME, orjson.dumps({
+            fmt: {
+                key: str(path.relative_to(self.cache_root)) if path.is_relative_to(self.cache_root) else str(path)
+                for key, path in fmt_entries.items()
+            }
+            for fmt, fmt_entries in manifest.items()
+        }, option=orjson.OPT_INDENT_2))
+        self._manifest = manifest
+        logger.info(f"Model manifest: {len(entries)} {output_format.upper()} file(s)")
+        return entries
     
     def _get_cache_path(self, source_path: pathlib.Path, output_format: str = 'glb') -> pathlib.Path:
         """
@@ -61,9 +443,12 @@ class ModelConverter:
         Returns:
             Path to the cached file
         """
-        # Create a hash of the file path for unique identification
-        path_hash = hashlib.md5(str(source_path).encode()).hexdigest()
-        return self.cache_root / f"{path_hash}.{output_format}"
+        # Hash of the file path for unique identification, memoized per string form
+        return _cache_path_for(self._cache_root_str, str(source_path), output_format)
+    
+    def _ttl_ns(self) -> int:
+        """Cache TTL in integer nanoseconds, for comparing against st_mtime_ns"""
+        return int(self.cache_ttl_hours * _NS_PER_HOUR)
     
     def _is_cache_valid(self, source_path: pathlib.Path, cache_path: pathlib.Path) -> bool:
         """
@@ -76,21 +461,61 @@ class ModelConverter:
         Returns:
             True if cache is valid, False otherwise
         """
-        if not cache_path.exists():
+        key = (str(source_path), str(cache_path))
+        try:
+            cache_mtime_ns = cache_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._validity_cache.pop(key, None)
             return False
         
+        checked_at = self._validity_cache.get(key)
+        if checked_at is not None and time.monotonic() - checked_at < _VALIDITY_WINDOW_SECONDS:
+            return True
+        
         # Check if cache has expired based on TTL
-        cache_mtime = cache_path.stat().st_mtime
-        current_time = time.time()
-        cache_age_hours = (current_time - cache_mtime) / 3600
+        cache_age_ns = time.time_ns() - cache_mtime_ns
         
-        if cache_age_hours > self.cache_ttl_hours:
-            logger.info(f"Cache expired for {cache_path.name} (age: {cache_age_hours:.1f}h)")
+        if cache_age_ns > self._ttl_ns():
+            logger.info(f"Cache expired for {cache_path.name} (age: {cache_age_ns / _NS_PER_HOUR:.1f}h)")
+            self._validity_cache.pop(key, None)
             return False
         
         # Check if source file is newer than cache
-        source_mtime = source_path.stat().st_mtime
-        return cache_mtime >= source_mtime
+        source_stat = self._cached_stat(source_path)
+        if source_stat is None:
+            self._validity_cache.pop(key, None)
+            return False
+        source_mtime_ns = source_stat.st_mtime_ns
+        if cache_mtime_ns >= source_mtime_ns or self._source_unchanged(source_path, cache_path):
+            self._validity_cache[key] = time.monotonic()
+            return True
+        self._validity_cache.pop(key, None)
+        return False
+    
+    def _source_unchanged(self, source_path: pathlib.Path, cache_path: pathlib.Path) -> bool:
+        """
+        True if a source that looks newer than its cache (touched, or copied with a new
+        mtime) still has the content the cache was converted from. The cache and its
+        sidecar are touched so the mtime check passes again next time.
+        """
+        sidecar = _digest_sidecar(cache_path)
+        try:
+            recorded = sidecar.read_text().strip()
+            if not recorded or recorded != _content_digest(source_path):
+                return False
+            os.utime(cache_path)
+            os.utime(sidecar)
+        except OSError:
+            return False
+        logger.info(f"Source unchanged since conversion, reusing cache: {cache_path.name}")
+        return True
+    
+    def _record_source_digest(self, source_path: pathlib.Path, cache_path: pathlib.Path) -> None:
+        """Remember which source content a real (non-placeholder) conversion came from"""
+        try:
+            _digest_sidecar(cache_path).write_text(_content_digest(source_path))
+        except OSError as e:
+            logger.warning(f"Could not record source digest for {cache_path.name}: {e}")
     
     def convert_to_gltf(
         self, 
@@ -109,16 +534,16 @@ class ModelConverter:
         Returns:
             Path to the converted file, or None if conversion failed
         """
-        if not source_path.exists():
-            logger.error(f"Source file not found: {source_path}")
-            return None
-        
-        # Check file extension
+        # Check file extension first: a string lookup, no syscall
         file_ext = source_path.suffix.lower()
         if file_ext not in SUPPORTED_FORMATS:
             logger.warning(f"Unsupported format: {file_ext}")
             return None
         
+        if self._cached_stat(source_path) is None:
+            logger.error(f"Source file not found: {source_path}")
+            return None
+        
         # If source is already a GLB/GLTF file and output format matches, return it directly
         if file_ext in {'.glb', '.gltf'}:
             if output_format == 'glb' and file_ext == '.glb':
@@ -131,9 +556,39 @@ class ModelConverter:
         # Check cache
         cache_path = self._get_cache_path(source_path, output_format)
         if not force_reconvert and self._is_cache_valid(source_path, cache_path):
-            logger.info(f"Using cached file: {cache_path}")
+            # Hot path: skip formatting the message when INFO is off
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Using cached file: {cache_path}")
             return cache_path
         
+        # One conversion per cache file at a time: concurrent misses wait for it
+        # instead of each running trimesh/OCC and racing on the export
+        key = str(cache_path)
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                self._inflight[key] = done = threading.Event()
+        if inflight is not None:
+            inflight.wait()
+            # Whatever that conversion produced (model or placeholder) is in the cache now
+            if self._is_cache_valid(source_path, cache_path):
+                return cache_path
+            return self.convert_to_gltf(source_path, output_format, force_reconvert)
+        try:
+            return self._convert_uncached(source_path, cache_path, output_format, file_ext)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            done.set()
+    
+    def _convert_uncached(
+        self,
+        source_path: pathlib.Path,
+        cache_path: pathlib.Path,
+        output_format: str,
+        file_ext: str
+    ) -> Optional[pathlib.Path]:
+        """Run the conversion for a cache miss; only called by the thread that owns cache_path"""
         try:
             logger.info(f"Converting {source_path} to {output_format.upper()}")
             
@@ -146,6 +601,9 @@ class ModelConverter:
             # Load the mesh using trimesh
             # Trimesh supports STEP/STP files through pythonocc or other backends
             try:
+                # trimesh is imported on first conversion; workers that only serve
+                # catalog/build endpoints never pay its import time or memory
+                import trimesh
                 mesh = trimesh.load(str(source_path), force='mesh')
             except Exception as load_error:
                 # If loading fails and it's a STEP file, try alternative methods
@@ -163,7 +621,9 @@ class ModelConverter:
             
             # Export mesh or scene
             # Trimesh's export method handles both meshes and scenes
-            mesh.export(str(cache_path), file_type=output_format)
+            # Dense tessellations are decimated once here; the cache keeps the result
+            _export_atomic(_simplify_if_dense(mesh), cache_path, output_format)
+            self._record_source_digest(source_path, cache_path)
             
             logger.info(f"Successfully converted to: {cache_path}")
             return cache_path
@@ -205,59 +665,62 @@ class ModelConverter:
             Path to converted file or None
         """
         # Try pythonocc-core as fallback (if cascadio failed)
-        try:
-            from OCC.Core import STEPControl_Reader
-            from OCC.Core import IFSelect_ReturnStatus
-            from OCC.Core import BRepMesh_IncrementalMesh
-            from OCC.Core import TopExp
-            from OCC.Core import TopAbs
-            from OCC.Core import BRep_Tool
-            from OCC.Core import TopoDS
-            
-            reader = STEPControl_Reader()
-            status = reader.ReadFile(str(source_path))
-            
-            if status == IFSelect_ReturnStatus.IFSelect_RetDone:
-                reader.TransferRoots()
-                shape = reader.OneShape()
-                mesh = BRepMesh_IncrementalMesh(shape, 0.1, True)
-                mesh.Perform()
-                
-                vertices = []
-                faces = []
+        occ = _pythonocc()
+        if occ is not None:
+            try:
+                reader = occ.STEPControl_Reader()
+                status = reader.ReadFile(str(source_path))
                 
-                exp = TopExp.TopExp_Explorer(shape, TopAbs.TopAbs_FACE)
-                while exp.More():
-                    face = TopoDS.topods_Face(exp.Current())
-                    location = face.Location()
-                    triangulation = BRep_Tool.Triangulation(face, location)
+                if status == occ.IFSelect_ReturnStatus.IFSelect_RetDone:
+                    reader.TransferRoots()
+                    shape = reader.OneShape()
+                    mesh = occ.BRepMesh_IncrementalMesh(shape, _linear_deflection(occ, shape), True)
+                    mesh.Perform()
+                    
+                    np = occ.np
+                    # One preallocated block per OCC face, concatenated once at the end
+                    vertex_blocks = []
+                    face_blocks = []
+                    vertex_count = 0
                     
-                    if triangulation:
-                        nodes = triangulation.Nodes()
-                        triangles = triangulation.Triangles()
-                        base_index = len(vertices)
+                    exp = occ.TopExp.TopExp_Explorer(shape, occ.TopAbs.TopAbs_FACE)
+                    while exp.More():
+                        face = occ.TopoDS.topods_Face(exp.Current())
+                        location = face.Location()
+                        triangulation = occ.BRep_Tool.Triangulation(face, location)
                         
-                        for i in range(1, nodes.Length() + 1):
-                            node = nodes.Value(i)
-                            vertices.append([node.X(), node.Y(), node.Z()])
+                        if triangulation:
+                            nodes = triangulation.Nodes()
+                            triangles = triangulation.Triangles()
+                            
+                            node_count = nodes.Length()
+                            face_vertices = np.empty((node_count, 3), dtype=np.float64)
+                            for i in range(node_count):
+                                node = nodes.Value(i + 1)
+                                face_vertices[i] = (node.X(), node.Y(), node.Z())
+                            
+                            triangle_count = triangles.Length()
+                            face_indices = np.empty((triangle_count, 3), dtype=np.int64)
+                            for i in range(triangle_count):
+                                face_indices[i] = triangles.Value(i + 1).Get()
+                            # OCC node indices are 1-based within each face
+                            face_indices += vertex_count - 1
+                            
+                            vertex_blocks.append(face_vertices)
+                            face_blocks.append(face_indices)
+                            vertex_count += node_count
                         
-                        for i in range(1, triangles.Length() + 1):
-                            triangle = triangles.Value(i)
-                            n1, n2, n3 = triangle.Get()
-                            faces.append([base_index + n1 - 1, base_index + n2 - 1, base_index + n3 - 1])
+                        exp.Next()
                     
-                    exp.Next()
-                
-                if vertices and faces:
-                    import numpy as np
-                    mesh_obj = trimesh.Trimesh(vertices=np.array(vertices), faces=np.array(faces))
-                    mesh_obj.export(str(cache_path), file_type=output_format)
-                    logger.info(f"Successfully converted STEP using pythonocc: {cache_path}")
-                    return cache_path
-        except ImportError:
-            pass
-        except Exception as e:
-            logger.warning(f"pythonocc conversion failed: {e}")
+                    if vertex_count and any(len(block) for block in face_blocks):
+                        import trimesh
+                        mesh_obj = trimesh.Trimesh(vertices=np.concatenate(vertex_blocks), faces=np.concatenate(face_blocks))
+                        _export_atomic(_simplify_if_dense(mesh_obj), cache_path, output_format)
+                        self._record_source_digest(source_path, cache_path)
+                        logger.info(f"Successfully converted STEP using pythonocc: {cache_path}")
+                        return cache_path
+            except Exception as e:
+                logger.warning(f"pythonocc conversion failed: {e}")
         
         # If all else fails, create a placeholder mesh
         logger.warning(f"All STEP conversion methods failed for {source_path}, creating placeholder")
@@ -292,8 +755,11 @@ class ModelConverter:
             elif 'prop' in source_path.stem.lower():
                 size = 0.1  # Propellers are medium
             
+            import trimesh
             placeholder = trimesh.creation.box(extents=[size, size, size * 0.5])
-            placeholder.export(str(cache_path), file_type=output_format)
+            _export_atomic(placeholder, cache_path, output_format)
+            # A placeholder must not be revived as if it were a real conversion
+            _digest_sidecar(cache_path).unlink(missing_ok=True)
             logger.info(f"Created placeholder mesh for {source_path.name} at {cache_path}")
             return cache_path
         except Exception as e:
@@ -304,6 +770,8 @@ class ModelConverter:
         """
         Get the full path to a model file in the assets directory.
         Also checks for pre-converted GLB files and handles normalized URLs.
+        A resolution is reused for a few seconds, so repeated requests for the same
+        component skip the up-to-four probes.
         
         Args:
             category: Component category (e.g., 'motors', 'frames')
@@ -312,8 +780,26 @@ class ModelConverter:
         Returns:
             Full path to the model file or None if not found
         """
+        key = (category, filename)
+        now = time.monotonic()
+        cached = self._resolution_cache.get(key)
+        if cached is not None and now - cached[0] < _RESOLUTION_TTL_SECONDS:
+            return cached[1]
+        resolved = self._resolve_model_path(category, filename)
+        if len(self._resolution_cache) >= _STAT_CACHE_MAX_ENTRIES:
+            self._resolution_cache.clear()
+        self._resolution_cache[key] = (now, resolved)
+        return resolved
+    
+    def clear_resolution_cache(self) -> None:
+        """Forget memoized asset lookups and stats (e.g. after assets were added or removed)"""
+        self._resolution_cache.clear()
+        self._stat_cache.clear()
+    
+    def _resolve_model_path(self, category: str, filename: str) -> Optional[pathlib.Path]:
+        """Uncached body of get_model_path"""
         model_path = self.asset_root / category / filename
-        if model_path.exists():
+        if self._cached_stat(model_path) is not None:
             return model_path
         
         # If a .glb file was requested but doesn't exist, check for source files
@@ -322,24 +808,37 @@ class ModelConverter:
             # Try to find the original STEP/STP/SLDPRT file
             for ext in ['.step', '.stp', '.sldprt']:
                 source_path = model_path.with_suffix(ext)
-                if source_path.exists():
+                if self._cached_stat(source_path) is not None:
                     logger.info(f"Found source file for normalized GLB request: {source_path}")
                     return source_path
         
         # Check for pre-converted GLB file (same name but .glb extension)
         if model_path.suffix.lower() in {'.step', '.stp', '.sldprt'}:
             glb_path = model_path.with_suffix('.glb')
-            if glb_path.exists():
+            if self._cached_stat(glb_path) is not None:
                 logger.info(f"Found pre-converted GLB file: {glb_path}")
                 return glb_path
         
         return None
     
+    def get_served_path(self, path: pathlib.Path, prefix: str) -> Optional[str]:
+        """
+        URL of a cached file under an internal reverse-proxy location that aliases
+        cache_root (e.g. nginx "location /_cache/ { internal; alias .../assets-cache/; }"),
+        or None if the file isn't in the cache.
+        """
+        try:
+            relative = path.relative_to(self.cache_root)
+        except ValueError:
+            return None
+        return f"{prefix.rstrip('/')}/{relative.as_posix()}"
+    
     def convert_component_model(
         self, 
         category: str, 
         filename: str,
-        output_format: str = 'glb'
+        output_format: str = 'glb',
+        force_reconvert: bool = False
     ) -> Tuple[Optional[pathlib.Path], Optional[str]]:
         """
         Convert a component model to GLTF format.
@@ -349,25 +848,33 @@ class ModelConverter:
             category: Component category
             filename: Model filename
             output_format: Output format ('glb' or 'gltf')
+            force_reconvert: If True, ignore the manifest and cache and reconvert
         
         Returns:
             Tuple of (converted_path, error_message)
         """
+        # Assets listed in the manifest were converted ahead of time
+        manifest_path = None if force_reconvert else self._manifest.get(output_format, {}).get(f"{category}/{filename}")
+        if manifest_path is not None and manifest_path.is_file():
+            return manifest_path, None
+        
         # First, check if a pre-converted GLB file exists directly
         # This handles cases where GLB files are already in the assets directory
-        glb_path = self.asset_root / category / filename
-        if glb_path.suffix.lower() == '.glb' and glb_path.exists() and output_format == 'glb':
-            # Check file size - placeholder meshes are typically very small (< 10KB)
-            # Real converted models are usually much larger
-            file_size = glb_path.stat().st_size
-            if file_size > 10240:  # 10KB threshold
+        # Joined as strings; a Path is only built once the GLB is known to exist
+        glb_stat = None
+        if output_format == 'glb' and os.path.splitext(filename)[1].lower() == '.glb':
+            glb_stat = self._cached_stat(os.path.join(self._asset_root_str, category, filename))
+        if glb_stat is not None:
+            glb_path = self.asset_root / category / filename
+            # Placeholder meshes are a single box; real converted models have far more vertices
+            file_size = glb_stat.st_size
+            if not is_placeholder_glb(glb_path, glb_stat):
                 logger.info(f"Found pre-converted GLB file: {glb_path} ({file_size} bytes)")
                 # Copy to cache for consistency and return cached version
                 cache_path = self._get_cache_path(glb_path, output_format)
-                if not cache_path.exists() or not self._is_cache_valid(glb_path, cache_path):
-                    import shutil
+                if not self._is_cache_valid(glb_path, cache_path):
                     cache_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(glb_path, cache_path)
+                    _copy_atomic(glb_path, cache_path)
                     logger.info(f"Copied pre-converted GLB to cache: {cache_path}")
                 return cache_path, None
             else:
@@ -382,15 +889,14 @@ class ModelConverter:
         if source_path.suffix.lower() == '.glb' and output_format == 'glb':
             # Copy to cache for consistency
             cache_path = self._get_cache_path(source_path, output_format)
-            if not cache_path.exists() or not self._is_cache_valid(source_path, cache_path):
-                import shutil
+            if not self._is_cache_valid(source_path, cache_path):
                 cache_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source_path, cache_path)
+                _copy_atomic(source_path, cache_path)
                 logger.info(f"Copied pre-converted GLB to cache: {cache_path}")
             return cache_path, None
         
         # Otherwise, attempt conversion
-        converted_path = self.convert_to_gltf(source_path, output_format)
+        converted_path = self.convert_to_gltf(source_path, output_format, force_reconvert)
         if not converted_path:
             # Last resort: try to create a placeholder
             logger.warning(f"Conversion failed for {category}/{filename}, attempting placeholder creation")
@@ -403,9 +909,62 @@ class ModelConverter:
         
         return converted_path, None
     
+    def convert_many(
+        self,
+        items: List[Tuple[str, str]],
+        output_format: str = 'glb',
+        max_workers: Optional[int] = None
+    ) -> List[Tuple[Optional[pathlib.Path], Optional[str]]]:
+        """
+        Convert several component models concurrently.
+        trimesh's loaders and exporters spend most of their time in I/O and native
+        code, so a thread pool overlaps the conversions; cached models are
+        returned directly without a worker.
+        
+        Args:
+            items: (category, filename) pairs
+            output_format: Output format ('glb' or 'gltf')
+            max_workers: Thread count (default: one per CPU, capped at the number of cache misses)
+        
+        Returns:
+            (converted_path, error_message) for each item, in input order
+        """
+        # Duplicates share one conversion rather than racing on the same cache file
+        unique = list(dict.fromkeys(items))
+        results = {}
+        misses = []
+        for item in unique:
+            # Cache hits and missing files resolve immediately; only real conversions need workers
+            if self._resolves_without_conversion(item[0], item[1], output_format):
+                results[item] = self.convert_component_model(item[0], item[1], output_format)
+            else:
+                misses.append(item)
+        
+        if len(misses) == 1:
+            results[misses[0]] = self.convert_component_model(misses[0][0], misses[0][1], output_format)
+        elif misses:
+            workers = max(1, min(len(misses), max_workers or os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results.update(zip(misses, pool.map(
+                    lambda item: self.convert_component_model(item[0], item[1], output_format),
+                    misses
+                )))
+        return [results[item] for item in items]
+    
+    def _resolves_without_conversion(self, category: str, filename: str, output_format: str) -> bool:
+        """True if convert_component_model would answer from the manifest or cache, or with a not-found error"""
+        manifest_path = self._manifest.get(output_format, {}).get(f"{category}/{filename}")
+        if manifest_path is not None and manifest_path.is_file():
+            return True
+        source_path = self.get_model_path(category, filename)
+        if source_path is None:
+            return True
+        return self._is_cache_valid(source_path, self._get_cache_path(source_path, output_format))
+    
     def cleanup_expired_cache(self) -> int:
         """
         Remove expired cached files based on TTL.
+        The manifest and the conversions it pins are kept until it is rebuilt or cleared.
         
         Returns:
             Number of files deleted
@@ -413,20 +972,21 @@ class ModelConverter:
         if not self.cache_root.exists():
             return 0
         
-        deleted_count = 0
-        current_time = time.time()
-        ttl_seconds = self.cache_ttl_hours * 3600
-        
-        for cache_file in self.cache_root.iterdir():
-            if cache_file.is_file():
-                file_age_seconds = current_time - cache_file.stat().st_mtime
-                if file_age_seconds > ttl_seconds:
-                    try:
-                        cache_file.unlink()
-                        deleted_count += 1
-                        logger.info(f"Deleted expired cache file: {cache_file.name}")
-                    except Exception as e:
-                        logger.error(f"Failed to delete cache file {cache_file.name}: {e}")
+        now_ns = time.time_ns()
+        ttl_ns = self._ttl_ns()
+        self._validity_cache.clear()
+        self.clear_resolution_cache()
+        pinned = self._pinned_names()
+        
+        # scandir entries carry the file type (and often the stat) from the directory read
+        with os.scandir(self.cache_root) as entries:
+            expired = [
+                entry for entry in entries
+                if entry.name not in pinned
+                and entry.is_file(follow_symlinks=False)
+                and now_ns - entry.stat(follow_symlinks=False).st_mtime_ns > ttl_ns
+            ]
+        deleted_count = _unlink_all(expired, log_deletes=True)
         
         logger.info(f"Cache cleanup completed: {deleted_count} files deleted")
         return deleted_count
@@ -441,14 +1001,12 @@ class ModelConverter:
         if not self.cache_root.exists():
             return 0
         
-        deleted_count = 0
-        for cache_file in self.cache_root.iterdir():
-            if cache_file.is_file():
-                try:
-                    cache_file.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to delete cache file {cache_file.name}: {e}")
+        self._validity_cache.clear()
+        self.clear_resolution_cache()
+        self._manifest = {}
+        with os.scandir(self.cache_root) as entries:
+            files = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+        deleted_count = _unlink_all(files)
         
         logger.info(f"Cache cleared: {deleted_count} files deleted")
         return deleted_count
@@ -466,15 +1024,21 @@ class ModelConverter:
         total_files = 0
         total_size = 0
         expired_files = 0
-        current_time = time.time()
-        ttl_seconds = self.cache_ttl_hours * 3600
+        now_ns = time.time_ns()
+        ttl_ns = self._ttl_ns()
+        pinned = self._pinned_names()
         
-        for cache_file in self.cache_root.iterdir():
-            if cache_file.is_file():
+        with os.scandir(self.cache_root) as entries:
+            for entry in entries:
+                # Only converted models count; the manifest and digest sidecars are bookkeeping
+                if entry.name == MANIFEST_NAME or entry.name.endswith(_SIDECAR_SUFFIX):
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
                 total_files += 1
-                total_size += cache_file.stat().st_size
-                file_age_seconds = current_time - cache_file.stat().st_mtime
-                if file_age_seconds > ttl_seconds:
+                total_size += stat.st_size
+                if entry.name not in pinned and now_ns - stat.st_mtime_ns > ttl_ns:
                     expired_files += 1
         
         return {
@@ -1,4 +1,5 @@
-import json
+import threading
+import orjson
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
@@ -8,47 +9,82 @@ DATA_DIR = Path(__file__).parent.parent.parent / "rotorbench" / "src" / "data"
 USERS_FILE = DATA_DIR / "users.json"
 
 from models.user import UserProfile
+from utils.component_data import file_stamp
+from utils.file_lock import locked, write_atomic
 
-def _load_users_raw() -> list:
+# (stamp, users.json rows, id index), reused until the file's mtime/size changes.
+# Replaced as one tuple under _store_lock, so readers never pair rows with another
+# version's index or stamp. Rows are never mutated in place (saves replace them);
+# writers copy the list first.
+_store = (None, None, None)
+_store_lock = threading.Lock()
+
+def _read() -> list:
     if not USERS_FILE.exists():
         return []
-    with open(USERS_FILE, "r") as f:
-        return json.load(f)
+    return orjson.loads(USERS_FILE.read_bytes())
+
+def _index(users: list) -> dict:
+    by_id = {}
+    for u in users:
+        by_id.setdefault(u.get("id"), u)  # first row wins, like the linear scan
+    return by_id
+
+def _write(users: list) -> None:
+    global _store
+    # Holding the lock across the write keeps a concurrent reload from publishing
+    # the old rows under the new file's stamp
+    with _store_lock:
+        write_atomic(USERS_FILE, orjson.dumps(users, option=orjson.OPT_INDENT_2))
+        _store = (file_stamp(USERS_FILE), users, _index(users))
+
+def _users() -> tuple:
+    global _store
+    store = _store
+    if store[1] is not None and store[0] == file_stamp(USERS_FILE):
+        return store
+    with _store_lock:
+        stamp = file_stamp(USERS_FILE)
+        if _store[1] is None or _store[0] != stamp:
+            users = _read()
+            _store = (stamp, users, _index(users))
+        return _store
+
+def _load_users_raw() -> list:
+    return _users()[1]
 
 def list_users() -> List[UserProfile]:
-    return [UserProfile(**u) for u in _load_users_raw()]
+    return [UserProfile.from_trusted(u) for u in _load_users_raw()]
 
 def get_user(user_id: str) -> Optional[UserProfile]:
-    for u in _load_users_raw():
-        if u.get("id") == user_id:
-            return UserProfile(**u)
-    return None
+    u = _users()[2].get(user_id)
+    return UserProfile.from_trusted(u) if u is not None else None
 
 def save_user(profile: UserProfile) -> bool:
-    users = _load_users_raw()
     as_dict = profile.model_dump(by_alias=True)
     # ensure datetimes are strings
     as_dict["createdAt"] = profile.created_at.isoformat()
     as_dict["updatedAt"] = profile.updated_at.isoformat()
 
-    # upsert
-    for i, u in enumerate(users):
-        if u.get("id") == profile.id:
-            users[i] = as_dict
-            break
-    else:
-        users.append(as_dict)
-
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=2)
+    with locked(USERS_FILE):
+        users = list(_load_users_raw())
+
+        # upsert
+        for i, u in enumerate(users):
+            if u.get("id") == profile.id:
+                users[i] = as_dict
+                break
+        else:
+            users.append(as_dict)
+
+        _write(users)
     return True
 
 def delete_user(user_id: str) -> bool:
-    users = _load_users_raw()
-    new_users = [u for u in users if u.get("id") != user_id]
-    if len(new_users) == len(users):
-        return False
-    with open(USERS_FILE, "w") as f:
-        json.dump(new_users, f, indent=2)
+    with locked(USERS_FILE):
+        users = _load_users_raw()
+        new_users = [u for u in users if u.get("id") != user_id]
+        if len(new_users) == len(users):
+            return False
+        _write(new_users)
     return True